@@ -19,7 +19,10 @@ supabase = create_client(os.environ["SUPABASE_URL"], os.environ["SUPABASE_SERVIC
 def main():
     # List recent completed checkout sessions
     print("Fetching recent checkout sessions from Stripe...")
-    sessions = stripe.checkout.Session.list(limit=10, status="complete")
+    # Expand the subscription inline so activation needs no extra retrieve
+    sessions = stripe.checkout.Session.list(
+        limit=10, status="complete", expand=["data.subscription"]
+    )
 
     subscription_sessions = [
         s for s in sessions.data if s.mode == "subscription" and s.subscription
@@ -42,8 +45,8 @@ def main():
         print("ERROR: No user_id in session metadata.")
         return
 
-    # Get subscription details
-    sub = stripe.Subscription.retrieve(session.subscription)
+    # Subscription details (expanded on the session)
+    sub = session.subscription
     print(f"\nSubscription object keys: {list(sub.keys())}")
     print(f"Subscription status: {sub.get('status')}")
     print(f"current_period_end: {sub.get('current_period_end')}")
@@ -63,7 +66,7 @@ def main():
     period_end = datetime.fromtimestamp(period_end_ts, tz=timezone.utc)
 
     print(f"\nActivating subscription for user {user_id}:")
-    print(f"  subscription_id: {session.subscription}")
+    print(f"  subscription_id: {sub.id}")
     print(f"  customer_id:     {session.customer}")
     print(f"  period_end:      {period_end.isoformat()}")
 
@@ -77,7 +80,7 @@ def main():
         supabase.table("profiles")
         .update({
             "subscription_status": "active",
-            "subscription_id": session.subscription,
+            "subscription_id": sub.id,
             "stripe_customer_id": session.customer,
             "current_period_end": period_end.isoformat(),
             "period_request_count": 0,
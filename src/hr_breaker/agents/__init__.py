@@ -2,7 +2,7 @@ from .job_parser import parse_job_posting, COMPANY_NOT_SPECIFIED
 from .optimizer import optimize_resume
 from .combined_reviewer import combined_review, compute_ats_score
 from .name_extractor import extract_name
-from .content_integrity import check_content_integrity
+from .content_integrity import check_content_integrity, check_content_integrity_batch
 
 __all__ = [
     "parse_job_posting",
@@ -12,4 +12,5 @@ __all__ = [
     "compute_ats_score",
     "extract_name",
     "check_content_integrity",
+    "check_content_integrity_batch",
 ]
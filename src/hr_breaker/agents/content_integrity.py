@@ -1,9 +1,17 @@
+import asyncio
+import difflib
+import hashlib
+import time
+from collections import OrderedDict
 from datetime import date
+from functools import lru_cache
 
+from google import genai
+from google.genai import types
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent
 
-from hr_breaker.config import get_model_settings, get_settings
+from hr_breaker.config import get_model, get_model_settings, get_settings, logger
 from hr_breaker.models import FilterResult, OptimizedResume, ResumeSource
 
 
@@ -88,46 +96,73 @@ SCORING:
 - 0.5-0.7 = Multiple genuine AI tells
 - 0.7-1.0 = Clearly fabricated or AI-generated
 
+=== DIFF INPUT ===
+Sometimes you receive CHANGES (a unified diff from the original to the optimized resume) instead of the full optimized resume.
+Lines starting with "+" are optimized content, "-" lines were removed, other lines are unchanged context.
+Score fabrications in the CHANGES against the full ORIGINAL, and run the AI-generation check on the "+" lines.
+
 === OUTPUT ===
 Return all four fields: no_hallucination_score, hallucination_concerns, ai_probability, ai_indicators
 """
 
 
+BATCH_TERMINAL_STATES = {
+    types.JobState.JOB_STATE_SUCCEEDED,
+    types.JobState.JOB_STATE_FAILED,
+    types.JobState.JOB_STATE_CANCELLED,
+    types.JobState.JOB_STATE_EXPIRED,
+}
+
+# Results keyed by sha256(source + optimized) so identical pairs skip the LLM
+RESULT_CACHE_SIZE = 1024
+RESULT_CACHE_TTL = 7 * 24 * 3600.0
+
+# Use the diff prompt only when it is at most this fraction of the optimized content
+DIFF_MAX_RATIO = 0.5
+
+_result_cache: OrderedDict[str, tuple[float, tuple[FilterResult, FilterResult]]] = OrderedDict()
+
+
+def _current_date_prompt() -> str:
+    return f"Today's date: {date.today().strftime('%B %Y')}"
+
+
+@lru_cache
 def get_content_integrity_agent() -> Agent:
     settings = get_settings()
     agent = Agent(
-        f"google-gla:{settings.gemini_flash_model}",
+        get_model(settings.gemini_flash_model),
         output_type=ContentIntegrityResult,
         system_prompt=SYSTEM_PROMPT,
         model_settings=get_model_settings(),
     )
 
+    # Re-evaluated on every run, so the cached agent still sees today's date
     @agent.system_prompt
     def add_current_date() -> str:
-        return f"Today's date: {date.today().strftime('%B %Y')}"
+        return _current_date_prompt()
 
     return agent
 
 
-async def check_content_integrity(
-    optimized: OptimizedResume,
-    source: ResumeSource,
-) -> tuple[FilterResult, FilterResult]:
-    """Check content integrity: hallucination + AI detection in one call.
+# Shared across batch calls so each one reuses the client's connection pool
+@lru_cache
+def _get_batch_client() -> genai.Client:
+    return genai.Client(api_key=get_settings().google_api_key)
 
-    Returns tuple of (hallucination_result, ai_generated_result) for compatibility.
-    """
-    # Get optimized content
+
+def _get_optimized_content(optimized: OptimizedResume) -> str:
     if optimized.pdf_text:
-        optimized_content = optimized.pdf_text
-    elif optimized.html:
-        optimized_content = optimized.html
-    elif optimized.data:
-        optimized_content = optimized.data.model_dump_json(indent=2)
-    else:
-        optimized_content = "(no content)"
+        return optimized.pdf_text
+    if optimized.html:
+        return optimized.html
+    if optimized.data:
+        return optimized.serialized
+    return "(no content)"
+
 
-    prompt = f"""Perform both content integrity checks on this resume.
+def _build_prompt(optimized_content: str, source: ResumeSource) -> str:
+    return f"""Perform both content integrity checks on this resume.
 
 === ORIGINAL RESUME (source of truth) ===
 {source.content}
@@ -141,10 +176,39 @@ async def check_content_integrity(
 2. Analyze the optimized version for AI-generation patterns
 """
 
-    agent = get_content_integrity_agent()
-    result = await agent.run(prompt)
-    r = result.output
 
+def _build_diff_prompt(diff: str, source: ResumeSource) -> str:
+    return f"""Perform both content integrity checks on the changes made to this resume.
+
+=== ORIGINAL RESUME (source of truth) ===
+{source.content}
+
+=== CHANGES (unified diff, original -> optimized) ===
+{diff}
+
+=== END ===
+
+1. Score how faithful the changes are to the original (hallucination check)
+2. Analyze the added lines for AI-generation patterns
+"""
+
+
+def _diff_content(source_content: str, optimized_content: str) -> str:
+    """Line-level unified diff from source to optimized, with 2 lines of context."""
+    return "\n".join(
+        difflib.unified_diff(
+            source_content.splitlines(),
+            optimized_content.splitlines(),
+            fromfile="original",
+            tofile="optimized",
+            n=2,
+            lineterm="",
+        )
+    )
+
+
+def _to_filter_results(r: ContentIntegrityResult) -> tuple[FilterResult, FilterResult]:
+    """Split a combined integrity result into (hallucination, ai_generated) results."""
     # Build hallucination result
     hall_issues = []
     hall_suggestions = []
@@ -184,3 +248,138 @@ async def check_content_integrity(
     )
 
     return hallucination_result, ai_result
+
+
+def _unchanged_results() -> tuple[FilterResult, FilterResult]:
+    """Perfect scores for an optimized resume identical to the original."""
+    return (
+        FilterResult(
+            filter_name="HallucinationChecker",
+            passed=True,
+            score=1.0,
+            threshold=0.9,
+        ),
+        FilterResult(
+            filter_name="AIGeneratedChecker",
+            passed=True,
+            score=1.0,
+            threshold=0.5,
+        ),
+    )
+
+
+def _copy_results(results: tuple[FilterResult, FilterResult]) -> tuple[FilterResult, FilterResult]:
+    """Copy cached results so callers can't mutate the cache."""
+    hallucination_result, ai_result = results
+    return hallucination_result.model_copy(deep=True), ai_result.model_copy(deep=True)
+
+
+async def check_content_integrity(
+    optimized: OptimizedResume,
+    source: ResumeSource,
+    full: bool = True,
+) -> tuple[FilterResult, FilterResult]:
+    """Check content integrity: hallucination + AI detection in one call.
+
+    With full=False the model sees only a diff of the optimized content against
+    the original, falling back to the full prompt when the diff would not be
+    meaningfully shorter (e.g. the formats differ).
+
+    Returns tuple of (hallucination_result, ai_generated_result) for compatibility.
+    Results are cached per (source, optimized) content pair and prompt mode.
+    """
+    optimized_content = _get_optimized_content(optimized)
+
+    # Unchanged resume: nothing can be fabricated, skip the LLM call
+    if optimized_content == source.content:
+        return _unchanged_results()
+
+    prompt = None
+    if not full:
+        diff = _diff_content(source.content, optimized_content)
+        if len(diff) <= len(optimized_content) * DIFF_MAX_RATIO:
+            prompt = _build_diff_prompt(diff, source)
+    mode = b"full" if prompt is None else b"diff"
+
+    key = hashlib.sha256(
+        mode + b"\x00" + source.content.encode() + b"\x00" + optimized_content.encode()
+    ).hexdigest()
+
+    cached = _result_cache.get(key)
+    if cached is not None:
+        stored_at, results = cached
+        if time.monotonic() - stored_at < RESULT_CACHE_TTL:
+            _result_cache.move_to_end(key)
+            return _copy_results(results)
+        del _result_cache[key]
+
+    if prompt is None:
+        prompt = _build_prompt(optimized_content, source)
+    agent = get_content_integrity_agent()
+    result = await agent.run(prompt)
+    results = _to_filter_results(result.output)
+
+    _result_cache[key] = (time.monotonic(), results)
+    if len(_result_cache) > RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+    return _copy_results(results)
+
+
+async def check_content_integrity_batch(
+    pairs: list[tuple[OptimizedResume, ResumeSource]],
+    poll_interval: float = 30.0,
+) -> list[tuple[FilterResult, FilterResult]]:
+    """Check content integrity for many resumes via the Gemini Batch API.
+
+    Submits all pairs as one batch job (billed at the discounted batch rate)
+    and polls until it finishes. Batch jobs may take minutes to hours, so this
+    is meant for bulk scoring, not the interactive optimization loop.
+
+    Returns results in the same order as `pairs`.
+    """
+    if not pairs:
+        return []
+
+    settings = get_settings()
+    config: dict = {
+        "system_instruction": f"{SYSTEM_PROMPT}\n{_current_date_prompt()}",
+        "response_mime_type": "application/json",
+        "response_schema": ContentIntegrityResult,
+    }
+    if settings.gemini_thinking_budget is not None:
+        config["thinking_config"] = {"thinking_budget": settings.gemini_thinking_budget}
+
+    requests = [
+        {
+            "contents": [{"role": "user", "parts": [{"text": _build_prompt(_get_optimized_content(optimized), source)}]}],
+            "config": config,
+        }
+        for optimized, source in pairs
+    ]
+
+    client = _get_batch_client()
+    job = await client.aio.batches.create(
+        model=settings.gemini_flash_model,
+        src=requests,
+        config={"display_name": f"content-integrity-{len(pairs)}"},
+    )
+    logger.info("Submitted content integrity batch %s (%d items)", job.name, len(pairs))
+
+    while job.state not in BATCH_TERMINAL_STATES:
+        await asyncio.sleep(poll_interval)
+        job = await client.aio.batches.get(name=job.name)
+
+    if job.state != types.JobState.JOB_STATE_SUCCEEDED:
+        raise RuntimeError(f"Content integrity batch {job.name} ended in state {job.state}: {job.error}")
+
+    responses = job.dest.inlined_responses if job.dest else None
+    if not responses or len(responses) != len(pairs):
+        raise RuntimeError(f"Content integrity batch {job.name} returned incomplete results")
+
+    results = []
+    for i, item in enumerate(responses):
+        if item.error or not item.response:
+            raise RuntimeError(f"Content integrity batch item {i} failed: {item.error}")
+        parsed = ContentIntegrityResult.model_validate_json(item.response.text)
+        results.append(_to_filter_results(parsed))
+    return results
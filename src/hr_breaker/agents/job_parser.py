@@ -1,12 +1,15 @@
+import re
 from functools import lru_cache
 
 from pydantic_ai import Agent
 
-from hr_breaker.config import get_model_settings, get_settings, logger
+from hr_breaker.config import get_model, get_model_settings, get_settings, logger
 from hr_breaker.models import JobPosting
 
 COMPANY_NOT_SPECIFIED = "Not Specified"
 
+_WORD_RE = re.compile(r"\w+")
+
 SYSTEM_PROMPT = """You are a job posting parser. Extract structured information from job postings.
 
 Extract:
@@ -29,16 +32,22 @@ Rules:
 def get_job_parser_agent() -> Agent:
     settings = get_settings()
     return Agent(
-        f"google-gla:{settings.gemini_flash_model}",
+        get_model(settings.gemini_flash_model),
         output_type=JobPosting,
         system_prompt=SYSTEM_PROMPT,
         model_settings=get_model_settings(),
     )
 
 
-def _is_grounded(value: str, text: str) -> bool:
-    """Check if extracted value actually appears in the source text."""
+def _grounding_context(text: str) -> tuple[str, set[str]]:
+    """Lowercase the source text and tokenize it once for grounding checks."""
     text_lower = text.lower()
+    return text_lower, set(_WORD_RE.findall(text_lower))
+
+
+def _is_grounded(value: str, ctx: tuple[str, set[str]]) -> bool:
+    """Check if extracted value actually appears in the source text."""
+    text_lower, word_set = ctx
     value_lower = value.lower().strip()
     if not value_lower or value_lower in ("unknown", COMPANY_NOT_SPECIFIED.lower()):
         return True
@@ -46,8 +55,12 @@ def _is_grounded(value: str, text: str) -> bool:
     if value_lower in text_lower:
         return True
     # Check if all words from the value appear in the text
-    words = value_lower.split()
-    return all(w in text_lower for w in words)
+    return word_set.issuperset(_WORD_RE.findall(value_lower))
+
+
+def _ungrounded(values: list[str], ctx: tuple[str, set[str]]) -> list[str]:
+    """Return the values that do not appear in the source text."""
+    return [v for v in values if not _is_grounded(v, ctx)]
 
 
 async def parse_job_posting(text: str) -> JobPosting:
@@ -56,12 +69,16 @@ async def parse_job_posting(text: str) -> JobPosting:
     result = await agent.run(f"Parse this job posting:\n\n{text}")
     job = result.output
 
+    ctx = _grounding_context(text)
     warnings = []
-    if not _is_grounded(job.company, text):
+    if not _is_grounded(job.company, ctx):
         warnings.append(f"company '{job.company}' not found in posting text")
         job.company = COMPANY_NOT_SPECIFIED
-    if not _is_grounded(job.title, text):
+    if not _is_grounded(job.title, ctx):
         warnings.append(f"title '{job.title}' not found in posting text")
+    missing_keywords = _ungrounded(job.keywords, ctx)
+    if missing_keywords:
+        warnings.append(f"keywords {missing_keywords} not found in posting text")
 
     if warnings:
         logger.warning("Job parser grounding issues: %s", "; ".join(warnings))
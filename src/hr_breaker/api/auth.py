@@ -1,12 +1,20 @@
 """JWT verification via Supabase."""
 
-from datetime import datetime, timezone
-from functools import lru_cache
+import asyncio
+import base64
+import hashlib
+import hmac
+import re
+import time
+from collections import OrderedDict
 from typing import Any
 
 import httpx
-from jose import JWTError, jwt, jwk
-from jose.utils import base64url_decode
+import orjson
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
 
 from hr_breaker.config import get_settings, logger
 
@@ -20,40 +28,176 @@ class AuthError(Exception):
         super().__init__(message)
 
 
-@lru_cache(maxsize=1)
-def _get_jwks(supabase_url: str) -> dict[str, Any]:
-    """Fetch JWKS from Supabase (cached)."""
-    jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
-    try:
-        response = httpx.get(jwks_url, timeout=10)
-        response.raise_for_status()
-        return response.json()
-    except Exception as e:
-        logger.error(f"Failed to fetch JWKS: {e}")
-        raise AuthError("Failed to fetch JWKS", status_code=500) from e
+# JWKS cache TTL when the response has no Cache-Control max-age
+JWKS_DEFAULT_TTL = 600.0
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+_jwks_cache: dict[str, Any] = {"keys": None, "fetched_at": 0.0, "ttl": JWKS_DEFAULT_TTL}
+_jwks_lock = asyncio.Lock()
+_http_client: httpx.AsyncClient | None = None
+
+# Verified token payloads keyed by token hash, evicted at exp or LRU
+VERIFIED_CACHE_SIZE = 4096
+_verified: OrderedDict[bytes, dict[str, Any]] = OrderedDict()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client used for auth requests."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared async HTTP client (called on app shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
+def _parse_max_age(cache_control: str | None) -> float | None:
+    """Extract max-age seconds from a Cache-Control header."""
+    if not cache_control:
+        return None
+    match = _MAX_AGE_RE.search(cache_control)
+    return float(match.group(1)) if match else None
 
-def _get_signing_key(token: str, jwks: dict[str, Any]) -> dict[str, Any]:
-    """Get the signing key from JWKS that matches the token's kid."""
-    unverified_header = jwt.get_unverified_header(token)
-    kid = unverified_header.get("kid")
 
+def _build_public_keys(jwks: dict[str, Any]) -> dict[str, ec.EllipticCurvePublicKey]:
+    """Construct P-256 public key objects from JWKS, keyed by kid."""
+    keys = {}
     for key in jwks.get("keys", []):
-        if key.get("kid") == kid:
-            return key
+        if key.get("kty") != "EC" or key.get("crv") != "P-256":
+            continue
+        numbers = ec.EllipticCurvePublicNumbers(
+            x=int.from_bytes(_b64url_decode(key["x"]), "big"),
+            y=int.from_bytes(_b64url_decode(key["y"]), "big"),
+            curve=ec.SECP256R1(),
+        )
+        keys[key.get("kid")] = numbers.public_key()
+    return keys
+
+
+async def _get_public_keys(supabase_url: str) -> dict[str, ec.EllipticCurvePublicKey]:
+    """Fetch JWKS from Supabase as public keys (cached, honoring Cache-Control max-age)."""
+    if _jwks_cache["keys"] is not None and time.monotonic() - _jwks_cache["fetched_at"] < _jwks_cache["ttl"]:
+        return _jwks_cache["keys"]
+
+    async with _jwks_lock:
+        # Another request may have refreshed the cache while we waited
+        if _jwks_cache["keys"] is not None and time.monotonic() - _jwks_cache["fetched_at"] < _jwks_cache["ttl"]:
+            return _jwks_cache["keys"]
+
+        jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
+        try:
+            response = await get_http_client().get(jwks_url)
+            response.raise_for_status()
+            keys = _build_public_keys(response.json())
+        except Exception as e:
+            logger.error(f"Failed to fetch JWKS: {e}")
+            raise AuthError("Failed to fetch JWKS", status_code=500) from e
+
+        max_age = _parse_max_age(response.headers.get("cache-control"))
+        _jwks_cache["keys"] = keys
+        _jwks_cache["fetched_at"] = time.monotonic()
+        _jwks_cache["ttl"] = max_age if max_age is not None else JWKS_DEFAULT_TTL
+        return keys
+
+
+def _get_public_key(
+    kid: str | None, keys: dict[str, ec.EllipticCurvePublicKey]
+) -> ec.EllipticCurvePublicKey:
+    """Get the public key matching the token's kid."""
+    if kid in keys:
+        return keys[kid]
 
     # If no kid match, try the first key
-    if jwks.get("keys"):
-        return jwks["keys"][0]
+    if keys:
+        return next(iter(keys.values()))
 
     raise AuthError("No matching signing key found")
 
 
-def verify_jwt(token: str) -> dict[str, Any]:
+def _b64url_decode(data: str) -> bytes:
+    """Decode unpadded base64url, as used in JWS segments."""
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _split_token(token: str) -> tuple[bytes, dict[str, Any], dict[str, Any], bytes]:
+    """Split a compact JWS once, returning (signing_input, header, payload, signature)."""
+    try:
+        header_b64, payload_b64, sig_b64 = token.split(".")
+        header = orjson.loads(_b64url_decode(header_b64))
+        payload = orjson.loads(_b64url_decode(payload_b64))
+        sig = _b64url_decode(sig_b64)
+    except (ValueError, orjson.JSONDecodeError) as e:
+        raise AuthError("Invalid token") from e
+
+    if not isinstance(header, dict) or not isinstance(payload, dict):
+        raise AuthError("Invalid token")
+    return f"{header_b64}.{payload_b64}".encode(), header, payload, sig
+
+
+def _verify_hs256(signing_input: bytes, sig: bytes, secret: str) -> None:
+    """Verify an HS256 signature against the JWT secret."""
+    expected = hmac.new(secret.encode(), signing_input, hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, sig):
+        logger.warning("JWT verification failed: invalid signature")
+        raise AuthError("Invalid token")
+
+
+def _verify_es256(
+    signing_input: bytes, sig: bytes, public_key: ec.EllipticCurvePublicKey
+) -> None:
+    """Verify an ES256 signature against the JWKS public key."""
+    if len(sig) != 64:
+        raise AuthError("Invalid token")
+
+    # JWS ES256 signatures are raw r || s; cryptography expects DER
+    der_sig = encode_dss_signature(
+        int.from_bytes(sig[:32], "big"), int.from_bytes(sig[32:], "big")
+    )
+    try:
+        public_key.verify(der_sig, signing_input, ec.ECDSA(hashes.SHA256()))
+    except InvalidSignature as e:
+        logger.warning("JWT verification failed: invalid signature")
+        raise AuthError("Invalid token") from e
+
+
+def _check_claims(payload: dict[str, Any]) -> None:
+    """Validate the aud, exp, nbf and iat claims of a signature-verified payload."""
+    aud = payload.get("aud")
+    if aud != "authenticated" and not (isinstance(aud, list) and "authenticated" in aud):
+        logger.warning(f"JWT verification failed: invalid audience {aud}")
+        raise AuthError("Invalid token")
+
+    for claim in ("exp", "nbf", "iat"):
+        value = payload.get(claim)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise AuthError("Invalid token")
+
+    now = time.time()
+    exp = payload.get("exp")
+    if exp and exp < now:
+        raise AuthError("Token has expired")
+
+    nbf = payload.get("nbf")
+    if nbf is not None and nbf > now:
+        raise AuthError("Token is not yet valid")
+
+
+async def verify_jwt(token: str) -> dict[str, Any]:
     """
     Verify a Supabase JWT token.
 
     Supports both HS256 (symmetric) and ES256 (asymmetric) algorithms.
+    Verified payloads are cached by token hash until the token expires.
 
     Args:
         token: The JWT token to verify
@@ -64,56 +208,44 @@ def verify_jwt(token: str) -> dict[str, Any]:
     Raises:
         AuthError: If the token is invalid or expired
     """
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = _verified.get(cache_key)
+    if cached is not None:
+        if cached["exp"] > time.time():
+            _verified.move_to_end(cache_key)
+            return cached
+        del _verified[cache_key]
+
     settings = get_settings()
+    signing_input, header, payload, sig = _split_token(token)
+    token_alg = header.get("alg")
 
-    try:
-        # Decode header to check algorithm
-        unverified_header = jwt.get_unverified_header(token)
-        token_alg = unverified_header.get("alg")
-
-        if token_alg == "HS256":
-            # Symmetric verification with JWT secret
-            if not settings.supabase_jwt_secret:
-                raise AuthError("JWT secret not configured", status_code=500)
-
-            payload = jwt.decode(
-                token,
-                settings.supabase_jwt_secret,
-                algorithms=["HS256"],
-                audience="authenticated",
-            )
-        elif token_alg == "ES256":
-            # Asymmetric verification with JWKS
-            if not settings.supabase_url:
-                raise AuthError("Supabase URL not configured", status_code=500)
-
-            jwks = _get_jwks(settings.supabase_url)
-            signing_key = _get_signing_key(token, jwks)
-
-            payload = jwt.decode(
-                token,
-                signing_key,
-                algorithms=["ES256"],
-                audience="authenticated",
-            )
-        else:
-            raise AuthError(f"Unsupported JWT algorithm: {token_alg}")
-
-        # Check expiration
-        exp = payload.get("exp")
-        if exp:
-            exp_datetime = datetime.fromtimestamp(exp, tz=timezone.utc)
-            if exp_datetime < datetime.now(tz=timezone.utc):
-                raise AuthError("Token has expired")
-
-        return payload
-
-    except JWTError as e:
-        logger.warning(f"JWT verification failed: {e}")
-        raise AuthError("Invalid token") from e
+    if token_alg == "HS256":
+        # Symmetric verification with JWT secret
+        if not settings.supabase_jwt_secret:
+            raise AuthError("JWT secret not configured", status_code=500)
+        _verify_hs256(signing_input, sig, settings.supabase_jwt_secret)
+    elif token_alg == "ES256":
+        # Asymmetric verification with JWKS
+        if not settings.supabase_url:
+            raise AuthError("Supabase URL not configured", status_code=500)
+
+        keys = await _get_public_keys(settings.supabase_url)
+        _verify_es256(signing_input, sig, _get_public_key(header.get("kid"), keys))
+    else:
+        raise AuthError(f"Unsupported JWT algorithm: {token_alg}")
+
+    _check_claims(payload)
+
+    if payload.get("exp"):
+        _verified[cache_key] = payload
+        if len(_verified) > VERIFIED_CACHE_SIZE:
+            _verified.popitem(last=False)
+
+    return payload
 
 
-def get_user_id_from_token(token: str) -> str:
+async def get_user_id_from_token(token: str) -> str:
     """
     Extract user ID from JWT token.
 
@@ -126,14 +258,14 @@ def get_user_id_from_token(token: str) -> str:
     Raises:
         AuthError: If the token is invalid or missing user ID
     """
-    payload = verify_jwt(token)
+    payload = await verify_jwt(token)
     user_id = payload.get("sub")
     if not user_id:
         raise AuthError("Token missing user ID")
     return user_id
 
 
-def get_email_from_token(token: str) -> str | None:
+async def get_email_from_token(token: str) -> str | None:
     """
     Extract email from JWT token.
 
@@ -143,7 +275,7 @@ def get_email_from_token(token: str) -> str | None:
     Returns:
         The user email or None
     """
-    payload = verify_jwt(token)
+    payload = await verify_jwt(token)
     email = payload.get("email")
     logger.info(f"Extracted email from token: {email}")
     return email
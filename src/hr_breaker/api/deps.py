@@ -1,32 +1,47 @@
 """Dependency injection for FastAPI routes."""
 
-from typing import Annotated
+from functools import lru_cache
+from typing import Annotated, Any
 
 from fastapi import Depends, Header, HTTPException
 
-from hr_breaker.api.auth import AuthError, get_user_id_from_token, get_email_from_token
+from hr_breaker.api.auth import AuthError, verify_jwt
+from hr_breaker.services.stripe_service import StripeError, StripeService
 from hr_breaker.services.supabase import SupabaseService
 
 
+@lru_cache
 def get_supabase_service() -> SupabaseService:
-    """Get Supabase service instance."""
+    """Get the shared Supabase service instance."""
     return SupabaseService()
 
 
-async def get_current_user(
-    authorization: Annotated[str | None, Header()] = None,
-) -> str:
-    """
-    Extract and verify the current user from the Authorization header.
+async def close_supabase_service() -> None:
+    """Close the shared Supabase service's connections (called on app shutdown)."""
+    if get_supabase_service.cache_info().currsize:
+        await get_supabase_service().aclose()
+        get_supabase_service.cache_clear()
 
-    Args:
-        authorization: The Authorization header value
 
-    Returns:
-        The user ID
+@lru_cache
+def _shared_stripe_service() -> StripeService:
+    return StripeService()
+
+
+def get_stripe_service() -> StripeService:
+    """Get the shared Stripe service instance."""
+    try:
+        return _shared_stripe_service()
+    except StripeError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+async def _decode_bearer(authorization: str | None) -> dict[str, Any]:
+    """
+    Verify the bearer token in the Authorization header and return its payload.
 
     Raises:
-        HTTPException: If authentication fails
+        HTTPException: If the header is missing, malformed, or the token is invalid
     """
     if not authorization:
         raise HTTPException(status_code=401, detail="Missing authorization header")
@@ -36,14 +51,33 @@ async def get_current_user(
     if len(parts) != 2 or parts[0].lower() != "bearer":
         raise HTTPException(status_code=401, detail="Invalid authorization header format")
 
-    token = parts[1]
-
     try:
-        user_id = get_user_id_from_token(token)
-        return user_id
+        payload = await verify_jwt(parts[1])
     except AuthError as e:
         raise HTTPException(status_code=e.status_code, detail=e.message) from e
 
+    if not payload.get("sub"):
+        raise HTTPException(status_code=401, detail="Token missing user ID")
+    return payload
+
+
+async def get_current_user(
+    authorization: Annotated[str | None, Header()] = None,
+) -> str:
+    """
+    Extract and verify the current user from the Authorization header.
+
+    Args:
+        authorization: The Authorization header value
+
+    Returns:
+        The user ID
+
+    Raises:
+        HTTPException: If authentication fails
+    """
+    return (await _decode_bearer(authorization))["sub"]
+
 
 async def get_current_user_email(
     authorization: Annotated[str | None, Header()] = None,
@@ -54,24 +88,12 @@ async def get_current_user_email(
     Returns:
         Tuple of (user_id, email)
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Missing authorization header")
-
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise HTTPException(status_code=401, detail="Invalid authorization header format")
-
-    token = parts[1]
-
-    try:
-        user_id = get_user_id_from_token(token)
-        email = get_email_from_token(token)
-        return user_id, email
-    except AuthError as e:
-        raise HTTPException(status_code=e.status_code, detail=e.message) from e
+    payload = await _decode_bearer(authorization)
+    return payload["sub"], payload.get("email")
 
 
 # Type aliases for dependency injection
 CurrentUser = Annotated[str, Depends(get_current_user)]
 CurrentUserWithEmail = Annotated[tuple[str, str | None], Depends(get_current_user_email)]
 SupabaseServiceDep = Annotated[SupabaseService, Depends(get_supabase_service)]
+StripeServiceDep = Annotated[StripeService, Depends(get_stripe_service)]
@@ -0,0 +1,40 @@
+"""Redis-backed job queue for running optimizations outside the API process."""
+
+import asyncio
+
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+
+from hr_breaker.config import get_settings
+
+_pool: ArqRedis | None = None
+_pool_lock = asyncio.Lock()
+
+
+def get_redis_settings() -> RedisSettings:
+    """Redis connection settings for the queue (shared by API and worker)."""
+    redis_url = get_settings().redis_url
+    if not redis_url:
+        # The worker is opt-in; fail at startup instead of polling a Redis that isn't there
+        raise RuntimeError("REDIS_URL is not set; the optimization worker requires it")
+    return RedisSettings.from_dsn(redis_url)
+
+
+async def get_job_queue() -> ArqRedis | None:
+    """Get the shared arq pool, or None when no Redis URL is configured."""
+    global _pool
+    if not get_settings().redis_url:
+        return None
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await create_pool(get_redis_settings())
+    return _pool
+
+
+async def close_job_queue() -> None:
+    """Close the shared arq pool."""
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
@@ -1,8 +1,14 @@
 """FastAPI application entry point."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from hr_breaker.api.auth import close_http_client
+from hr_breaker.api.deps import close_supabase_service
+from hr_breaker.api.job_queue import close_job_queue
 from hr_breaker.api.routes import (
     cvs_router,
     optimize_router,
@@ -11,14 +17,31 @@ from hr_breaker.api.routes import (
     webhooks_router,
 )
 from hr_breaker.api.schemas import HealthResponse
-from hr_breaker.config import get_settings
+from hr_breaker.config import close_llm_http_client, get_settings, start_queue_logging
+from hr_breaker.services.scrapers import PlaywrightScraper
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Move logging off the event loop; release shared clients on shutdown."""
+    log_listener = start_queue_logging()
+    yield
+    await close_http_client()
+    await close_supabase_service()
+    await close_llm_http_client()
+    await close_job_queue()
+    await PlaywrightScraper.shutdown()
+    log_listener.stop()
+
+
 app = FastAPI(
     title="HR-Breaker API",
     description="Resume optimization API for job postings",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -1,18 +1,28 @@
 """CV management API routes."""
 
-import tempfile
-from pathlib import Path
+import asyncio
+import hashlib
+from datetime import datetime
+from typing import Any
 
 from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
 from hr_breaker.api.deps import CurrentUser, SupabaseServiceDep
 from hr_breaker.api.schemas import CVDeleteResponse, CVListResponse, CVResponse
+from hr_breaker.api.streaming import stream_json_list
 from hr_breaker.services.pdf_parser import extract_text_from_pdf
 from hr_breaker.services.supabase import SupabaseError
 
 router = APIRouter()
 
 ALLOWED_EXTENSIONS = {"pdf", "txt", "tex", "md", "html"}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Resumes are well under this; larger uploads are rejected before being buffered
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+_datetime_adapter = TypeAdapter(datetime)
 
 
 def _extract_text(file_content: bytes, filename: str) -> str:
@@ -20,38 +30,31 @@ def _extract_text(file_content: bytes, filename: str) -> str:
     ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
 
     if ext == "pdf":
-        # Write to temp file for PDF parsing
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
-            f.write(file_content)
-            temp_path = Path(f.name)
-        try:
-            return extract_text_from_pdf(temp_path)
-        finally:
-            temp_path.unlink()
+        return extract_text_from_pdf(file_content)
     else:
         # Text-based files
         return file_content.decode("utf-8")
 
 
+def _cv_response(cv: dict[str, Any]) -> CVResponse:
+    """Build a CVResponse from a trusted DB row without re-validating it."""
+    return CVResponse.model_construct(
+        id=cv["id"],
+        name=cv["name"],
+        original_filename=cv["original_filename"],
+        content_text=cv.get("content_text"),
+        created_at=_datetime_adapter.validate_python(cv["created_at"]),
+    )
+
+
 @router.get("", response_model=CVListResponse)
 async def list_cvs(
     user_id: CurrentUser,
     supabase: SupabaseServiceDep,
-) -> CVListResponse:
-    """List all CVs for the current user."""
+) -> StreamingResponse:
+    """List all CVs for the current user, streamed page by page."""
     try:
-        cvs = supabase.list_cvs(user_id)
-        return CVListResponse(
-            cvs=[
-                CVResponse(
-                    id=cv["id"],
-                    name=cv["name"],
-                    original_filename=cv["original_filename"],
-                    created_at=cv["created_at"],
-                )
-                for cv in cvs
-            ]
-        )
+        return await stream_json_list("cvs", supabase.iter_cvs(user_id))
     except SupabaseError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -63,17 +66,11 @@ async def get_cv(
     supabase: SupabaseServiceDep,
 ) -> CVResponse:
     """Get a specific CV by ID."""
-    cv = supabase.get_cv(cv_id, user_id)
+    cv = await supabase.get_cv(cv_id, user_id)
     if not cv:
         raise HTTPException(status_code=404, detail="CV not found")
 
-    return CVResponse(
-        id=cv["id"],
-        name=cv["name"],
-        original_filename=cv["original_filename"],
-        content_text=cv.get("content_text"),
-        created_at=cv["created_at"],
-    )
+    return _cv_response(cv)
 
 
 @router.post("", response_model=CVResponse)
@@ -95,12 +92,29 @@ async def upload_cv(
             detail=f"File type not allowed. Allowed: {', '.join(ALLOWED_EXTENSIONS)}",
         )
 
-    # Read file content
-    file_content = await file.read()
+    # Read file content, hashing it as it streams in
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+    hasher = hashlib.sha256()
+    chunks = []
+    received = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        received += len(chunk)
+        if received > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+        hasher.update(chunk)
+        chunks.append(chunk)
+    file_content = b"".join(chunks)
+    content_hash = hasher.hexdigest()
+
+    # Identical re-upload: reuse the existing CV
+    existing = await supabase.get_cv_by_hash(user_id, content_hash)
+    if existing:
+        return _cv_response(existing)
 
     # Extract text
     try:
-        content_text = _extract_text(file_content, file.filename)
+        content_text = await asyncio.to_thread(_extract_text, file_content, file.filename)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Failed to extract text: {e}") from e
 
@@ -109,24 +123,19 @@ async def upload_cv(
 
     try:
         # Upload to storage
-        file_path = supabase.upload_cv_file(user_id, file_content, file.filename)
+        file_path = await supabase.upload_cv_file(user_id, file_content, file.filename)
 
         # Create database record
-        cv = supabase.create_cv(
+        cv = await supabase.create_cv(
             user_id=user_id,
             name=cv_name,
             file_path=file_path,
             original_filename=file.filename,
             content_text=content_text,
+            content_hash=content_hash,
         )
 
-        return CVResponse(
-            id=cv["id"],
-            name=cv["name"],
-            original_filename=cv["original_filename"],
-            content_text=cv.get("content_text"),
-            created_at=cv["created_at"],
-        )
+        return _cv_response(cv)
     except SupabaseError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -139,7 +148,7 @@ async def delete_cv(
 ) -> CVDeleteResponse:
     """Delete a CV."""
     try:
-        success = supabase.delete_cv(cv_id, user_id)
+        success = await supabase.delete_cv(cv_id, user_id)
         if not success:
             raise HTTPException(status_code=404, detail="CV not found")
         return CVDeleteResponse(success=True, message="CV deleted successfully")
@@ -1,23 +1,26 @@
 """Optimization API routes."""
 
 import asyncio
+import hashlib
 import time
+from datetime import timedelta
 from typing import Any
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
-from fastapi.responses import Response
+from fastapi.responses import RedirectResponse, StreamingResponse
 
 from hr_breaker.api.deps import CurrentUser, CurrentUserWithEmail, SupabaseServiceDep
-from hr_breaker.services.access_control import check_access
+from hr_breaker.api.job_queue import get_job_queue
+from hr_breaker.api.streaming import stream_json_list
+from hr_breaker.services.access_control import UserQuota, check_access
 from hr_breaker.api.schemas import (
     OptimizationListResponse,
     OptimizationStartResponse,
     OptimizationStatus,
-    OptimizationSummary,
     OptimizeRequest,
 )
 from hr_breaker.config import get_settings, logger
-from hr_breaker.models import ResumeSource
+from hr_breaker.models import JobPosting, ResumeSource
 from hr_breaker.orchestration import optimize_for_job
 from hr_breaker.services import scrape_job_posting, CloudflareBlockedError
 from hr_breaker.services.supabase import SupabaseError, SupabaseService
@@ -25,60 +28,175 @@ from hr_breaker.agents import parse_job_posting, extract_name
 
 router = APIRouter()
 
+# How long a scraped job URL stays cached before it is fetched again
+JOB_URL_CACHE_TTL = timedelta(hours=24)
+
+# Lifetime in seconds of signed result PDF download URLs
+PDF_URL_TTL = 300
+
+
+class _RunProgressWriter:
+    """Writes run progress in the background, coalescing updates that queue up.
+
+    While a write is in flight, newer updates are merged into a single pending
+    update, so the optimization loop never waits on Supabase and stale
+    intermediate states are dropped. Iteration feedback is append-only and is
+    never dropped: queued rows are inserted together in one request.
+    """
+
+    def __init__(self, supabase: SupabaseService, run_id: str):
+        self._supabase = supabase
+        self._run_id = run_id
+        self._pending: dict[str, Any] | None = None
+        self._iterations: list[dict[str, Any]] = []
+        self._task: asyncio.Task | None = None
+
+    def submit(self, data: dict[str, Any]) -> None:
+        if self._pending is None:
+            self._pending = dict(data)
+        else:
+            self._pending.update(data)
+        self._start()
+
+    def add_iteration(self, feedback: dict[str, Any]) -> None:
+        self._iterations.append(feedback)
+        self._start()
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while self._iterations or self._pending is not None:
+            if self._iterations:
+                rows, self._iterations = self._iterations, []
+                try:
+                    await self._supabase.add_optimization_iterations(self._run_id, rows)
+                except Exception as e:
+                    logger.warning(f"[{self._run_id}] Failed to write iteration feedback: {e}")
+            if self._pending is not None:
+                data, self._pending = self._pending, None
+                try:
+                    await self._supabase.update_optimization_run(self._run_id, data)
+                except Exception as e:
+                    logger.warning(f"[{self._run_id}] Failed to write progress: {e}")
+
+    async def flush(self) -> None:
+        """Wait for queued progress writes so a final update can't be overwritten."""
+        if self._task is not None:
+            await self._task
+
+
+async def _get_cv_name(
+    cv_id: str,
+    cv_content: str,
+    supabase: SupabaseService,
+    cv_first_name: str | None,
+    cv_last_name: str | None,
+    timing: dict[str, float],
+) -> tuple[str | None, str | None]:
+    """Get the candidate name, using the value cached on the CV row if present."""
+    if cv_first_name is not None or cv_last_name is not None:
+        first_name, last_name = cv_first_name or None, cv_last_name or None
+        logger.info(f"Name loaded from CV: {first_name} {last_name}")
+        return first_name, last_name
+
+    name_start = time.perf_counter()
+    first_name, last_name = await extract_name(cv_content)
+    timing["extract_name"] = time.perf_counter() - name_start
+    logger.info(f"Extracted name from CV: {first_name} {last_name}")
+    try:
+        # Store "" for names not found so they aren't re-extracted
+        await supabase.update_cv(
+            cv_id,
+            {"first_name": first_name or "", "last_name": last_name or ""},
+        )
+    except SupabaseError as e:
+        logger.warning(f"Failed to cache extracted name: {e}")
+    return first_name, last_name
+
+
+# Bounds in-process optimizations; the arq worker is bounded by its own max_jobs
+_optimization_semaphore = asyncio.Semaphore(get_settings().max_concurrent_optimizations)
+
+
+async def _run_optimization_in_process(**kwargs: Any) -> None:
+    """Run an optimization in the API process, waiting for a free slot."""
+    async with _optimization_semaphore:
+        await _run_optimization(**kwargs)
+
 
 async def _run_optimization(
     run_id: str,
     user_id: str,
+    cv_id: str,
     cv_content: str,
     job_input: str,
     max_iterations: int,
     parallel: bool,
     supabase: SupabaseService,
+    cv_first_name: str | None = None,
+    cv_last_name: str | None = None,
 ) -> None:
     """Background task to run the optimization."""
-    settings = get_settings()
     total_start = time.perf_counter()
     timing: dict[str, float] = {}
-    print(f"\n{'='*60}")
-    print(f"[{run_id}] OPTIMIZATION STARTED")
-    print(f"{'='*60}")
+    logger.info(f"[{run_id}] Optimization started")
+
+    # Name extraction doesn't depend on the job, so overlap it with scrape + parse
+    name_task = asyncio.create_task(
+        _get_cv_name(cv_id, cv_content, supabase, cv_first_name, cv_last_name, timing)
+    )
+    progress = _RunProgressWriter(supabase, run_id)
 
     try:
         # Step 1: Parse job posting
-        supabase.update_optimization_run(run_id, {
+        await supabase.update_optimization_run(run_id, {
             "status": "parse_job",
             "current_step": "Fetching and parsing job posting...",
         })
 
-        # Check if job_input is a URL or text
-        job_text = job_input
-        if job_input.startswith("http://") or job_input.startswith("https://"):
-            try:
-                scrape_start = time.perf_counter()
-                job_text = scrape_job_posting(job_input)
-                timing["scrape_job"] = time.perf_counter() - scrape_start
-                print(f"⏱️  Scrape job: {timing['scrape_job']:.2f}s")
-            except CloudflareBlockedError:
-                supabase.update_optimization_run(run_id, {
-                    "status": "failed",
-                    "current_step": None,
-                    "error": "Failed to fetch job posting: protected by Cloudflare. Please paste the job text instead.",
-                })
-                return
-            except Exception as e:
-                supabase.update_optimization_run(run_id, {
-                    "status": "failed",
-                    "current_step": None,
-                    "error": f"Failed to fetch job posting: {e}",
-                })
-                return
-
-        # Parse job posting
-        parse_start = time.perf_counter()
-        print(f"📋 Parsing job posting...")
-        job = await parse_job_posting(job_text)
-        timing["parse_job"] = time.perf_counter() - parse_start
-        print(f"⏱️  Parse job: {timing['parse_job']:.2f}s - {job.title} at {job.company}")
+        # Reuse a cached parse of the same job input (URLs expire, pasted text doesn't)
+        input_hash = hashlib.sha256(job_input.encode()).hexdigest()
+        is_url = job_input.startswith(("http://", "https://"))
+        cached_job = await supabase.get_cached_job(
+            input_hash, JOB_URL_CACHE_TTL if is_url else None
+        )
+        if cached_job:
+            job_text = cached_job["job_text"]
+            job = JobPosting.model_validate({**cached_job["job_parsed"], "raw_text": job_text})
+            logger.info(f"[{run_id}] Job posting loaded from cache")
+        else:
+            # Check if job_input is a URL or text
+            job_text = job_input
+            if is_url:
+                try:
+                    scrape_start = time.perf_counter()
+                    job_text = await asyncio.to_thread(scrape_job_posting, job_input)
+                    timing["scrape_job"] = time.perf_counter() - scrape_start
+                except CloudflareBlockedError:
+                    await supabase.update_optimization_run(run_id, {
+                        "status": "failed",
+                        "current_step": None,
+                        "error": "Failed to fetch job posting: protected by Cloudflare. Please paste the job text instead.",
+                    })
+                    return
+                except Exception as e:
+                    await supabase.update_optimization_run(run_id, {
+                        "status": "failed",
+                        "current_step": None,
+                        "error": f"Failed to fetch job posting: {e}",
+                    })
+                    return
+
+            # Parse job posting
+            parse_start = time.perf_counter()
+            job = await parse_job_posting(job_text)
+            timing["parse_job"] = time.perf_counter() - parse_start
+            await supabase.cache_job(
+                input_hash, job_text, job.model_dump(exclude={"raw_text"})
+            )
+
         logger.info(f"[{run_id}] Job parsed: {job.title} at {job.company}")
         job_parsed = {
             "title": job.title,
@@ -89,30 +207,23 @@ async def _run_optimization(
             "keywords": job.keywords,
         }
 
-        supabase.update_optimization_run(run_id, {
+        await supabase.update_optimization_run(run_id, {
             "status": "generate",
             "current_step": f"Optimizing resume for {job.title} at {job.company}...",
             "job_parsed": job_parsed,
         })
 
-        # Step 2: Extract name from CV and create ResumeSource
-        name_start = time.perf_counter()
-        print(f"👤 Extracting name from CV...")
-        first_name, last_name = await extract_name(cv_content)
-        timing["extract_name"] = time.perf_counter() - name_start
-        print(f"⏱️  Extract name: {timing['extract_name']:.2f}s - {first_name} {last_name}")
+        # Step 2: Name extraction (started alongside the job pipeline)
+        first_name, last_name = await name_task
         source = ResumeSource(
             content=cv_content,
             first_name=first_name,
             last_name=last_name,
         )
 
-        # Track feedback from each iteration
-        all_feedback: list[dict[str, Any]] = []
-
         def on_iteration(iteration: int, optimized: Any, validation: Any) -> None:
             """Callback for each optimization iteration."""
-            iteration_feedback = {
+            progress.add_iteration({
                 "iteration": iteration + 1,
                 "passed": validation.passed,
                 "results": [
@@ -126,20 +237,18 @@ async def _run_optimization(
                     }
                     for r in validation.results
                 ],
-            }
-            all_feedback.append(iteration_feedback)
+            })
 
             status = "validate" if iteration == 0 else "refine"
-            supabase.update_optimization_run(run_id, {
+            progress.submit({
                 "status": status,
                 "current_step": f"Iteration {iteration + 1}: {'Passed' if validation.passed else 'Refining'}...",
                 "iterations": iteration + 1,
-                "feedback": all_feedback,
             })
 
         # Step 3-5: Run optimization loop
         loop_start = time.perf_counter()
-        print(f"🔄 Starting optimization loop (max {max_iterations} iterations)...")
+        logger.info(f"[{run_id}] Starting optimization loop (max {max_iterations} iterations)")
         optimized, validation, _ = await optimize_for_job(
             source=source,
             job=job,
@@ -151,67 +260,53 @@ async def _run_optimization(
         timing["total"] = time.perf_counter() - total_start
 
         # Step 6: Save result
-        print(f"\n{'='*60}")
-        print(f"📊 OPTIMIZATION COMPLETE")
-        print(f"{'='*60}")
-        print(f"⏱️  Optimization loop: {timing['optimization_loop']:.2f}s")
-        print(f"⏱️  Total time: {timing['total']:.2f}s")
-        print(f"✅ Passed: {validation.passed}")
         result_html = optimized.html if optimized else None
         result_pdf_path = None
 
         if optimized and optimized.pdf_bytes:
             try:
-                result_pdf_path = supabase.upload_result_pdf(run_id, user_id, optimized.pdf_bytes)
+                result_pdf_path = await supabase.upload_result_pdf(run_id, user_id, optimized.pdf_bytes)
             except SupabaseError as e:
                 logger.error(f"Failed to upload result PDF: {e}")
 
         logger.info(f"[{run_id}] Saving results to database...")
-        supabase.update_optimization_run(run_id, {
+        await progress.flush()
+        await supabase.update_optimization_run(run_id, {
             "status": "complete",
             "current_step": None,
             "result_html": result_html,
             "result_pdf_path": result_pdf_path,
-            "feedback": all_feedback,
             "timing": timing,
         })
-        logger.info(f"[{run_id}] Optimization complete! Timing: {timing}")
+        logger.info(
+            f"[{run_id}] Optimization complete (passed={validation.passed}), timing: {timing}"
+        )
 
     except Exception as e:
         logger.exception(f"Optimization failed: {e}")
-        supabase.update_optimization_run(run_id, {
+        await progress.flush()
+        await supabase.update_optimization_run(run_id, {
             "status": "failed",
             "current_step": None,
             "error": str(e),
         })
+    finally:
+        # Don't leave name extraction running after an early return or failure, and
+        # retrieve its outcome so a failed task doesn't log "exception was never retrieved"
+        name_task.cancel()
+        await asyncio.gather(name_task, return_exceptions=True)
 
 
 @router.get("", response_model=OptimizationListResponse)
 async def list_optimization_runs(
     user_id: CurrentUser,
     supabase: SupabaseServiceDep,
-) -> OptimizationListResponse:
-    """List all optimization runs for the current user."""
-    runs = supabase.list_optimization_runs(user_id)
-
-    summaries = []
-    for run in runs:
-        job_parsed = run.get("job_parsed") or {}
-        # Extract job_url if job_input looks like a URL
-        job_input = run.get("job_input") or ""
-        job_url = job_input if job_input.startswith(("http://", "https://")) else None
-        summaries.append(
-            OptimizationSummary(
-                id=run["id"],
-                status=run["status"],
-                job_title=job_parsed.get("title"),
-                job_company=job_parsed.get("company"),
-                job_url=job_url,
-                created_at=run["created_at"],
-            )
-        )
-
-    return OptimizationListResponse(runs=summaries)
+) -> StreamingResponse:
+    """List all optimization runs for the current user, streamed page by page."""
+    try:
+        return await stream_json_list("runs", supabase.iter_optimization_runs(user_id))
+    except SupabaseError as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
 
 
 @router.post("", response_model=OptimizationStartResponse)
@@ -224,12 +319,16 @@ async def start_optimization(
     """Start a new optimization run."""
     user_id, user_email = user
 
-    # Check access before starting
-    profile = supabase.get_profile(user_id)
+    # Fetch profile and CV concurrently, then check access before starting
+    profile, cv = await asyncio.gather(
+        supabase.get_profile(user_id),
+        supabase.get_cv(request.cv_id, user_id),
+    )
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    access = check_access(user_email or "", profile)
+    quota = UserQuota.from_profile(profile)
+    access = check_access(user_email or "", quota)
     if not access.allowed:
         if access.reason == "trial_exhausted":
             raise HTTPException(
@@ -245,7 +344,6 @@ async def start_optimization(
             raise HTTPException(status_code=402, detail="Access denied")
 
     # Verify CV exists and belongs to user
-    cv = supabase.get_cv(request.cv_id, user_id)
     if not cv:
         raise HTTPException(status_code=404, detail="CV not found")
 
@@ -254,38 +352,49 @@ async def start_optimization(
         raise HTTPException(status_code=400, detail="CV has no extracted text content")
 
     try:
-        # Create optimization run
-        run = supabase.create_optimization_run(
+        # Consume a request (skip for unlimited users) and create the run atomically
+        settings = get_settings()
+        run_id = await supabase.start_optimization_run(
             user_id=user_id,
             cv_id=request.cv_id,
             job_input=request.job_input,
+            consume=not access.unlimited,
+            is_subscriber=quota.subscription_status == "active",
+            subscription_limit=settings.subscription_request_limit,
         )
+        if run_id is None:
+            raise HTTPException(status_code=402, detail="Failed to consume request")
+
+        job_kwargs = {
+            "run_id": run_id,
+            "user_id": user_id,
+            "cv_id": request.cv_id,
+            "cv_content": cv_content,
+            "job_input": request.job_input,
+            "max_iterations": request.max_iterations,
+            "parallel": request.parallel,
+            "cv_first_name": cv.get("first_name"),
+            "cv_last_name": cv.get("last_name"),
+        }
 
-        # Consume a request atomically (skip for unlimited users)
-        if not access.unlimited:
-            is_subscriber = profile.get("subscription_status") == "active"
-            settings = get_settings()
-            consumed = supabase.consume_request_atomic(
-                user_id=user_id,
-                is_subscriber=is_subscriber,
-                subscription_limit=settings.subscription_request_limit,
-            )
-            if not consumed:
-                raise HTTPException(status_code=402, detail="Failed to consume request")
+        # Hand off to the worker queue when configured, else run in-process
+        try:
+            job_queue = await get_job_queue()
+        except Exception as e:
+            logger.error(f"[{run_id}] Job queue unavailable, running in-process: {e}")
+            job_queue = None
 
-        # Start background task
-        background_tasks.add_task(
-            _run_optimization,
-            run_id=run["id"],
-            user_id=user_id,
-            cv_content=cv_content,
-            job_input=request.job_input,
-            max_iterations=request.max_iterations,
-            parallel=request.parallel,
-            supabase=supabase,
-        )
+        if job_queue is None:
+            background_tasks.add_task(_run_optimization_in_process, supabase=supabase, **job_kwargs)
+        else:
+            try:
+                await job_queue.enqueue_job("run_optimization_job", _job_id=run_id, **job_kwargs)
+            except Exception as e:
+                # Redis may have accepted the job before the error; running it here too could run it twice
+                logger.error(f"[{run_id}] Failed to enqueue optimization: {e}")
+                raise HTTPException(status_code=503, detail="Optimization queue unavailable") from e
 
-        return OptimizationStartResponse(run_id=run["id"], status="pending")
+        return OptimizationStartResponse(run_id=run_id, status="pending")
 
     except SupabaseError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
@@ -298,27 +407,17 @@ async def get_optimization_status(
     supabase: SupabaseServiceDep,
 ) -> OptimizationStatus:
     """Get the status of an optimization run."""
-    run = supabase.get_optimization_run(run_id, user_id)
+    run = await supabase.get_optimization_run(run_id, user_id)
     if not run:
         raise HTTPException(status_code=404, detail="Optimization run not found")
 
-    # Extract job_url if job_input looks like a URL
-    job_input = run.get("job_input") or ""
-    job_url = job_input if job_input.startswith(("http://", "https://")) else None
-
-    return OptimizationStatus(
-        id=run["id"],
-        status=run["status"],
-        current_step=run.get("current_step"),
-        iterations=run.get("iterations", 0),
-        job_parsed=run.get("job_parsed"),
-        job_url=job_url,
-        feedback=run.get("feedback"),
-        result_html=run.get("result_html"),
-        error=run.get("error"),
-        timing=run.get("timing"),
-        created_at=run["created_at"],
-    )
+    # Runs from before optimization_iterations existed keep feedback in the legacy column
+    iterations = run.pop("optimization_iterations", None)
+    if iterations:
+        run["feedback"] = iterations
+
+    # Columns not on OptimizationStatus are ignored by validation
+    return OptimizationStatus.model_validate(run)
 
 
 @router.get("/{run_id}/pdf")
@@ -326,9 +425,9 @@ async def get_optimization_pdf(
     run_id: str,
     user_id: CurrentUser,
     supabase: SupabaseServiceDep,
-) -> Response:
+) -> RedirectResponse:
     """Download the result PDF for an optimization run."""
-    run = supabase.get_optimization_run(run_id, user_id)
+    run = await supabase.get_optimization_run_result(run_id, user_id)
     if not run:
         raise HTTPException(status_code=404, detail="Optimization run not found")
 
@@ -339,18 +438,18 @@ async def get_optimization_pdf(
     if not pdf_path:
         raise HTTPException(status_code=404, detail="No PDF available")
 
+    # Redirect to a short-lived signed URL so the bytes never pass through the API
     try:
-        pdf_bytes = supabase.download_result_pdf(pdf_path)
-        return Response(
-            content=pdf_bytes,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=resume_{run_id}.pdf",
-            },
+        pdf_url = await supabase.create_result_pdf_url(
+            pdf_path,
+            expires_in=PDF_URL_TTL,
+            download=f"resume_{run_id}.pdf",
         )
     except SupabaseError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
+    return RedirectResponse(pdf_url, status_code=302)
+
 
 @router.delete("/{run_id}")
 async def delete_optimization(
@@ -359,21 +458,10 @@ async def delete_optimization(
     supabase: SupabaseServiceDep,
 ) -> dict[str, bool]:
     """Delete an optimization run."""
-    run = supabase.get_optimization_run(run_id, user_id)
-    if not run:
-        raise HTTPException(status_code=404, detail="Optimization run not found")
-
     try:
-        # Delete the PDF from storage if it exists
-        pdf_path = run.get("result_pdf_path")
-        if pdf_path:
-            try:
-                supabase.delete_result_pdf(pdf_path)
-            except SupabaseError:
-                pass  # Ignore storage deletion errors
-
-        # Delete the optimization run record
-        supabase.delete_optimization_run(run_id)
-        return {"success": True}
+        deleted = await supabase.delete_optimization_run(run_id, user_id)
     except SupabaseError as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Optimization run not found")
+    return {"success": True}
@@ -1,16 +1,18 @@
 """Subscription API routes."""
 
+import asyncio
+import time
 from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, HTTPException, Request, Header
 from pydantic import BaseModel
 
-from hr_breaker.api.deps import CurrentUserWithEmail, SupabaseServiceDep
+from hr_breaker.api.deps import CurrentUserWithEmail, StripeServiceDep, SupabaseServiceDep
 from hr_breaker.config import get_settings, logger
-from hr_breaker.services.stripe_service import StripeService, StripeError
-from hr_breaker.services.supabase import SupabaseError
-from hr_breaker.services.access_control import check_access
+from hr_breaker.services.stripe_service import StripeError, StripeService
+from hr_breaker.services.supabase import SupabaseError, SupabaseService
+from hr_breaker.services.access_control import UserQuota, check_access
 
 router = APIRouter()
 
@@ -46,6 +48,12 @@ class SubscriptionStatusResponse(BaseModel):
     renewal_date: str | None
 
 
+# Recently verified checkout sessions: session_id -> (expires_at, user_id, response)
+VERIFY_CACHE_TTL = 60.0
+VERIFY_CACHE_SIZE = 1024
+_verified_sessions: dict[str, tuple[float, str, SubscriptionStatusResponse]] = {}
+
+
 @router.get("", response_model=SubscriptionStatusResponse)
 async def get_subscription_status(
     user: CurrentUserWithEmail,
@@ -54,14 +62,15 @@ async def get_subscription_status(
     """Get the current user's subscription status."""
     user_id, user_email = user
 
-    profile = supabase.get_profile(user_id)
+    profile = await supabase.get_profile(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    access = check_access(user_email or "", profile)
+    quota = UserQuota.from_profile(profile)
+    access = check_access(user_email or "", quota)
 
     return SubscriptionStatusResponse(
-        status=profile.get("subscription_status", "trial"),
+        status=quota.subscription_status,
         remaining_requests=access.remaining,
         is_unlimited=access.unlimited,
         is_trial=access.is_trial,
@@ -71,11 +80,54 @@ async def get_subscription_status(
     )
 
 
+async def _apply_checkout_session(
+    session: Any,
+    user_id: str,
+    supabase: SupabaseService,
+    stripe_service: StripeService,
+) -> None:
+    """Activate the subscription or add credits for a completed checkout session."""
+    if session.mode == "subscription" and session.subscription:
+        try:
+            subscription = await asyncio.to_thread(
+                stripe_service.resolve_subscription, session.subscription
+            )
+            period_end = datetime.fromtimestamp(
+                stripe_service.get_period_end(subscription), tz=timezone.utc
+            )
+        except StripeError as e:
+            logger.error(f"Failed to retrieve subscription via verify: {e}")
+            raise HTTPException(status_code=502, detail=f"Failed to verify with Stripe: {e}") from e
+
+        try:
+            await supabase.update_profile(user_id, {
+                "subscription_status": "active",
+                "subscription_id": subscription.id,
+                "stripe_customer_id": session.customer,
+                "current_period_end": period_end.isoformat(),
+                "period_request_count": 0,
+            })
+            logger.info(f"Verified and activated subscription for user {user_id}")
+        except SupabaseError as e:
+            logger.error(f"Failed to activate subscription via verify: {e}")
+            raise HTTPException(status_code=500, detail="Failed to update subscription") from e
+
+    elif session.metadata and session.metadata.get("type") == "addon":
+        settings = get_settings()
+        try:
+            await supabase.add_addon_credits_atomic(user_id, settings.addon_request_count)
+            logger.info(f"Verified and added addon credits for user {user_id}")
+        except SupabaseError as e:
+            logger.error(f"Failed to add addon credits via verify: {e}")
+            raise HTTPException(status_code=500, detail="Failed to add credits") from e
+
+
 @router.post("/verify-checkout", response_model=SubscriptionStatusResponse)
 async def verify_checkout(
     request: VerifyCheckoutRequest,
     user: CurrentUserWithEmail,
     supabase: SupabaseServiceDep,
+    stripe_service: StripeServiceDep,
 ) -> SubscriptionStatusResponse:
     """
     Verify a completed Stripe checkout session and activate the subscription.
@@ -85,9 +137,17 @@ async def verify_checkout(
     """
     user_id, user_email = user
 
+    # Repeat verification (e.g. frontend retry) of a session this worker just handled
+    cached = _verified_sessions.get(request.session_id)
+    if cached is not None:
+        expires_at, cached_user_id, cached_response = cached
+        if cached_user_id == user_id and expires_at > time.monotonic():
+            return cached_response
+
     try:
-        stripe_service = StripeService()
-        session = stripe_service.retrieve_checkout_session(request.session_id)
+        session = await asyncio.to_thread(
+            stripe_service.retrieve_checkout_session, request.session_id
+        )
     except StripeError as e:
         raise HTTPException(status_code=400, detail=f"Invalid session: {e}") from e
 
@@ -100,47 +160,31 @@ async def verify_checkout(
     if session.status != "complete":
         raise HTTPException(status_code=400, detail=f"Checkout not complete: {session.status}")
 
-    if session.mode == "subscription" and session.subscription:
-        try:
-            subscription = stripe_service.get_subscription(session.subscription)
-            period_end = datetime.fromtimestamp(
-                stripe_service.get_period_end(subscription), tz=timezone.utc
-            )
-        except StripeError as e:
-            logger.error(f"Failed to retrieve subscription via verify: {e}")
-            raise HTTPException(status_code=502, detail=f"Failed to verify with Stripe: {e}") from e
-
-        try:
-            supabase.update_profile(user_id, {
-                "subscription_status": "active",
-                "subscription_id": session.subscription,
-                "stripe_customer_id": session.customer,
-                "current_period_end": period_end.isoformat(),
-                "period_request_count": 0,
-            })
-            logger.info(f"Verified and activated subscription for user {user_id}")
-        except SupabaseError as e:
-            logger.error(f"Failed to activate subscription via verify: {e}")
-            raise HTTPException(status_code=500, detail="Failed to update subscription") from e
+    # Apply each session once; concurrent or repeated verifications skip the update
+    try:
+        claimed = await supabase.claim_stripe_session(session.id, user_id)
+    except SupabaseError as e:
+        raise HTTPException(status_code=500, detail="Failed to verify checkout") from e
 
-    elif session.metadata and session.metadata.get("type") == "addon":
-        settings = get_settings()
+    if claimed:
         try:
-            supabase.add_addon_credits_atomic(user_id, settings.addon_request_count)
-            logger.info(f"Verified and added addon credits for user {user_id}")
-        except SupabaseError as e:
-            logger.error(f"Failed to add addon credits via verify: {e}")
-            raise HTTPException(status_code=500, detail="Failed to add credits") from e
+            await _apply_checkout_session(session, user_id, supabase, stripe_service)
+        except HTTPException:
+            await supabase.release_stripe_session(session.id)
+            raise
+    else:
+        logger.info(f"Checkout session {session.id} already processed")
 
     # Return updated subscription status
-    profile = supabase.get_profile(user_id)
+    profile = await supabase.get_profile(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    access = check_access(user_email or "", profile)
+    quota = UserQuota.from_profile(profile)
+    access = check_access(user_email or "", quota)
 
-    return SubscriptionStatusResponse(
-        status=profile.get("subscription_status", "trial"),
+    response = SubscriptionStatusResponse(
+        status=quota.subscription_status,
         remaining_requests=access.remaining,
         is_unlimited=access.unlimited,
         is_trial=access.is_trial,
@@ -149,12 +193,20 @@ async def verify_checkout(
         renewal_date=access.renewal_date.isoformat() if access.renewal_date else None,
     )
 
+    _verified_sessions[request.session_id] = (
+        time.monotonic() + VERIFY_CACHE_TTL, user_id, response
+    )
+    if len(_verified_sessions) > VERIFY_CACHE_SIZE:
+        del _verified_sessions[next(iter(_verified_sessions))]
+    return response
+
 
 @router.post("/checkout/subscription", response_model=CheckoutResponse)
 async def create_subscription_checkout(
     request: CheckoutRequest,
     user: CurrentUserWithEmail,
     supabase: SupabaseServiceDep,
+    stripe_service: StripeServiceDep,
 ) -> CheckoutResponse:
     """Create a Stripe checkout session for subscription."""
     user_id, user_email = user
@@ -162,12 +214,12 @@ async def create_subscription_checkout(
     if not user_email:
         raise HTTPException(status_code=400, detail="User email required")
 
-    profile = supabase.get_profile(user_id)
+    profile = await supabase.get_profile(user_id)
     stripe_customer_id = profile.get("stripe_customer_id") if profile else None
 
     try:
-        stripe_service = StripeService()
-        checkout_url = stripe_service.create_checkout_session_subscription(
+        checkout_url = await asyncio.to_thread(
+            stripe_service.create_checkout_session_subscription,
             user_id=user_id,
             user_email=user_email,
             success_url=request.success_url,
@@ -185,11 +237,12 @@ async def create_addon_checkout(
     request: CheckoutRequest,
     user: CurrentUserWithEmail,
     supabase: SupabaseServiceDep,
+    stripe_service: StripeServiceDep,
 ) -> CheckoutResponse:
     """Create a Stripe checkout session for add-on pack."""
     user_id, user_email = user
 
-    profile = supabase.get_profile(user_id)
+    profile = await supabase.get_profile(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
@@ -208,8 +261,8 @@ async def create_addon_checkout(
         )
 
     try:
-        stripe_service = StripeService()
-        checkout_url = stripe_service.create_checkout_session_addon(
+        checkout_url = await asyncio.to_thread(
+            stripe_service.create_checkout_session_addon,
             user_id=user_id,
             stripe_customer_id=stripe_customer_id,
             success_url=request.success_url,
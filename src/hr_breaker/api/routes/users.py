@@ -9,7 +9,7 @@ from hr_breaker.api.schemas import (
     UserProfile,
     UserProfileUpdate,
 )
-from hr_breaker.api.auth import AuthError, get_user_id_from_token, get_email_from_token
+from hr_breaker.api.auth import AuthError, verify_jwt
 from hr_breaker.services.supabase import SupabaseError
 
 router = APIRouter()
@@ -19,12 +19,15 @@ router = APIRouter()
 async def verify_auth(request: AuthVerifyRequest) -> AuthVerifyResponse:
     """Verify an authentication token."""
     try:
-        user_id = get_user_id_from_token(request.access_token)
-        email = get_email_from_token(request.access_token)
-        return AuthVerifyResponse(valid=True, user_id=user_id, email=email)
+        payload = await verify_jwt(request.access_token)
     except AuthError:
         return AuthVerifyResponse(valid=False)
 
+    user_id = payload.get("sub")
+    if not user_id:
+        return AuthVerifyResponse(valid=False)
+    return AuthVerifyResponse(valid=True, user_id=user_id, email=payload.get("email"))
+
 
 @router.get("/me", response_model=UserProfile)
 async def get_current_profile(
@@ -34,12 +37,12 @@ async def get_current_profile(
     """Get the current user's profile."""
     user_id, email = user
 
-    profile = supabase.get_profile(user_id)
+    profile = await supabase.get_profile(user_id)
 
     if not profile:
         # Create profile if it doesn't exist
         try:
-            profile = supabase.create_profile(user_id, email or "")
+            profile = await supabase.create_profile(user_id, email or "")
         except SupabaseError as e:
             raise HTTPException(status_code=500, detail=str(e)) from e
 
@@ -77,7 +80,7 @@ async def update_current_profile(
         raise HTTPException(status_code=400, detail="No updates provided")
 
     try:
-        profile = supabase.update_profile(user_id, update_data)
+        profile = await supabase.update_profile(user_id, update_data)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
 
@@ -1,144 +1,226 @@
 """Webhook handlers for external services."""
 
+import asyncio
 from datetime import datetime, timezone
+from typing import Any
 
-from fastapi import APIRouter, HTTPException, Request, Header
+import orjson
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Header
 
+from hr_breaker.api.deps import StripeServiceDep, SupabaseServiceDep
 from hr_breaker.config import get_settings, logger
-from hr_breaker.services.stripe_service import StripeService, StripeError
-from hr_breaker.services.supabase import SupabaseService, SupabaseError
+from hr_breaker.services.stripe_service import StripeError, StripeService
+from hr_breaker.services.supabase import SupabaseError, SupabaseService
 
 router = APIRouter()
 
+MAX_WEBHOOK_BODY_BYTES = 64 * 1024
+
+# Processing runs after Stripe is acknowledged; transient failures are retried with backoff
+WEBHOOK_PROCESS_ATTEMPTS = 4
+WEBHOOK_PROCESS_BACKOFF = 1.0
+
+# Stripe subscription status -> profiles.subscription_status
+_STATUS_MAP = {
+    "active": "active",
+    "trialing": "active",
+    "canceled": "cancelled",
+    "incomplete_expired": "expired",
+}
+# Transient states — don't overwrite an active subscription
+_TRANSIENT_STATUSES = frozenset({"incomplete", "past_due", "unpaid"})
+
 
 @router.post("/stripe")
 async def handle_stripe_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
+    stripe_service: StripeServiceDep,
+    supabase: SupabaseServiceDep,
     stripe_signature: str = Header(None, alias="Stripe-Signature"),
 ) -> dict:
-    """Handle Stripe webhook events."""
+    """Verify and claim a Stripe webhook event, then process it in the background."""
     if not stripe_signature:
         raise HTTPException(status_code=400, detail="Missing Stripe signature")
 
-    payload = await request.body()
+    # Stripe events are a few KB; reject oversized bodies before buffering them
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_WEBHOOK_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Payload too large")
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_WEBHOOK_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Payload too large")
+    payload = bytes(body)
 
     try:
-        stripe_service = StripeService()
         event = stripe_service.construct_webhook_event(payload, stripe_signature)
     except StripeError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
     logger.info(f"Received Stripe webhook: {event.type}")
 
-    supabase = SupabaseService()
-    settings = get_settings()
-
+    # Stripe redelivers events on timeouts and errors; handle each one once
     try:
-        if event.type == "checkout.session.completed":
-            session = event.data.object
-            user_id = session.metadata.get("user_id")
-
-            if not user_id:
-                logger.error("No user_id in checkout session metadata")
-                return {"status": "error", "message": "No user_id in metadata"}
-
-            # Check if this is a subscription or addon
-            if session.mode == "subscription":
-                # Subscription checkout completed
-                subscription_id = session.subscription
-                customer_id = session.customer
-
-                # Get subscription details for period end
-                subscription = stripe_service.get_subscription(subscription_id)
-                period_end = datetime.fromtimestamp(
-                    stripe_service.get_period_end(subscription), tz=timezone.utc
-                )
-
-                updated = supabase.update_profile(user_id, {
-                    "subscription_status": "active",
-                    "subscription_id": subscription_id,
-                    "stripe_customer_id": customer_id,
-                    "current_period_end": period_end.isoformat(),
-                    "period_request_count": 0,
-                })
-                logger.info(f"Activated subscription for user {user_id}: {updated.get('subscription_status')}")
-
-            elif session.metadata.get("type") == "addon":
-                # Add-on purchase completed - use atomic function
-                supabase.add_addon_credits_atomic(user_id, settings.addon_request_count)
-                logger.info(f"Added {settings.addon_request_count} addon credits for user {user_id}")
-
-        elif event.type == "invoice.paid":
-            # Subscription renewed
-            invoice = event.data.object
-            subscription_id = invoice.subscription
-
-            if not subscription_id:
-                return {"status": "ok"}
-
-            # Get subscription to find user
-            subscription = stripe_service.get_subscription(subscription_id)
-            user_id = subscription.metadata.get("user_id")
-
-            if user_id:
-                period_end = datetime.fromtimestamp(
-                    stripe_service.get_period_end(subscription), tz=timezone.utc
-                )
+        claimed = await supabase.claim_stripe_event(event.id, event.type)
+    except SupabaseError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {e}") from e
+    if not claimed:
+        logger.info(f"Skipping already processed Stripe event {event.id}")
+        return {"status": "ok", "idempotent": True}
 
-                supabase.update_profile(user_id, {
-                    "subscription_status": "active",
-                    "current_period_end": period_end.isoformat(),
-                    "period_request_count": 0,  # Reset for new period
-                })
-                logger.info(f"Renewed subscription for user {user_id}")
-
-        elif event.type == "customer.subscription.updated":
-            subscription = event.data.object
-            user_id = subscription.metadata.get("user_id")
-
-            if user_id:
-                status = subscription.status
-                if status in ("active", "trialing"):
-                    db_status = "active"
-                elif status == "canceled":
-                    db_status = "cancelled"
-                elif status in ("incomplete", "past_due", "unpaid"):
-                    # Transient states — don't overwrite active subscription
-                    logger.warning(f"Ignoring transient subscription status '{status}' for user {user_id}")
-                    return {"status": "ok"}
-                elif status == "incomplete_expired":
-                    db_status = "expired"
-                else:
-                    logger.warning(f"Unknown subscription status '{status}' for user {user_id}, ignoring")
-                    return {"status": "ok"}
-
-                period_end = datetime.fromtimestamp(
-                    stripe_service.get_period_end(subscription), tz=timezone.utc
-                )
+    background_tasks.add_task(_process_event, event, payload, stripe_service, supabase)
+    return {"status": "ok"}
 
-                supabase.update_profile(user_id, {
-                    "subscription_status": db_status,
-                    "current_period_end": period_end.isoformat(),
-                })
-                logger.info(f"Updated subscription status to {db_status} for user {user_id}")
 
-        elif event.type == "customer.subscription.deleted":
-            subscription = event.data.object
-            user_id = subscription.metadata.get("user_id")
+async def _apply_event(
+    supabase: SupabaseService, event_type: str, user_id: str, payload: dict[str, Any]
+) -> None:
+    """Apply an event to the user's profile, raising SupabaseError if no profile row was updated."""
+    if not await supabase.apply_stripe_event(event_type, user_id, payload):
+        raise SupabaseError(f"No profile updated for user {user_id}")
 
-            if user_id:
-                supabase.update_profile(user_id, {
-                    "subscription_status": "expired",
-                })
-                logger.info(f"Subscription expired for user {user_id}")
 
-    except StripeError as e:
-        logger.error(f"Stripe API error in webhook: {e}")
-        # Return 502 so Stripe will retry the webhook
-        raise HTTPException(status_code=502, detail=f"Stripe API error: {e}") from e
-    except SupabaseError as e:
-        logger.error(f"Failed to update profile from webhook: {e}")
-        # Return 500 so Stripe will retry the webhook
-        raise HTTPException(status_code=500, detail=f"Database error: {e}") from e
+async def _apply_checkout_session(
+    session: Any, user_id: str, stripe_service: StripeService, supabase: SupabaseService
+) -> None:
+    """Apply a completed checkout session: activate the subscription or add add-on credits."""
+    settings = get_settings()
 
-    return {"status": "ok"}
+    # Check if this is a subscription or addon
+    if session.mode == "subscription":
+        # Subscription checkout completed
+        customer_id = session.customer
+
+        # Get subscription details for period end (fetched unless already expanded)
+        subscription = await asyncio.to_thread(
+            stripe_service.resolve_subscription, session.subscription
+        )
+        subscription_id = subscription.id
+        period_end = datetime.fromtimestamp(
+            stripe_service.get_period_end(subscription), tz=timezone.utc
+        )
+
+        await _apply_event(supabase, "checkout.session.completed", user_id, {
+            "subscription_id": subscription_id,
+            "stripe_customer_id": customer_id,
+            "current_period_end": period_end.isoformat(),
+        })
+        logger.info(f"Activated subscription for user {user_id}")
+
+    elif session.metadata.get("type") == "addon":
+        # Add-on purchase completed - credits are added atomically
+        await _apply_event(supabase, "checkout.session.completed", user_id, {
+            "addon_credits": settings.addon_request_count,
+        })
+        logger.info(f"Added {settings.addon_request_count} addon credits for user {user_id}")
+
+
+async def _process_event(
+    event: Any, payload: bytes, stripe_service: StripeService, supabase: SupabaseService
+) -> None:
+    """
+    Apply a claimed Stripe event after the webhook has been acknowledged.
+
+    Stripe won't redeliver an acknowledged event, so transient failures are retried with
+    backoff, and events that still fail are recorded in failed_stripe_events for replay.
+    """
+    for attempt in range(WEBHOOK_PROCESS_ATTEMPTS):
+        try:
+            await _handle_event(event, stripe_service, supabase)
+            return
+        except Exception as e:
+            if attempt < WEBHOOK_PROCESS_ATTEMPTS - 1:
+                logger.warning(
+                    f"Retrying Stripe event {event.id} ({event.type}) after attempt {attempt + 1} failed: {e}"
+                )
+                await asyncio.sleep(WEBHOOK_PROCESS_BACKOFF * 2**attempt)
+                continue
+
+            if isinstance(e, (StripeError, SupabaseError)):
+                logger.error(f"Failed to process Stripe event {event.id} ({event.type}): {e}")
+                error = str(e)
+            else:
+                logger.exception(f"Unexpected error processing Stripe event {event.id} ({event.type}): {e}")
+                error = repr(e)
+            # The event is already claimed, so anything unrecorded here would be lost
+            await supabase.record_failed_stripe_event(event.id, event.type, orjson.loads(payload), error)
+
+
+async def _handle_event(event: Any, stripe_service: StripeService, supabase: SupabaseService) -> None:
+    """Apply a Stripe event to the affected profile. Stripe SDK calls run in a worker thread."""
+    if event.type == "checkout.session.completed":
+        session = event.data.object
+        user_id = session.metadata.get("user_id")
+
+        if not user_id:
+            logger.error("No user_id in checkout session metadata")
+            return
+
+        # /verify-checkout may have applied this session already; apply each session once
+        if not await supabase.claim_stripe_session(session.id, user_id):
+            logger.info(f"Checkout session {session.id} already processed")
+            return
+
+        try:
+            await _apply_checkout_session(session, user_id, stripe_service, supabase)
+        except Exception:
+            await supabase.release_stripe_session(session.id)
+            raise
+
+    elif event.type == "invoice.paid":
+        # Subscription renewed
+        invoice = event.data.object
+        subscription_id = invoice.subscription
+
+        if not subscription_id:
+            return
+
+        # Get subscription to find user
+        subscription = await asyncio.to_thread(stripe_service.get_subscription, subscription_id)
+        user_id = subscription.metadata.get("user_id")
+
+        if user_id:
+            period_end = datetime.fromtimestamp(
+                stripe_service.get_period_end(subscription), tz=timezone.utc
+            )
+
+            # Also resets period_request_count for the new period
+            await _apply_event(supabase, event.type, user_id, {
+                "current_period_end": period_end.isoformat(),
+            })
+            logger.info(f"Renewed subscription for user {user_id}")
+
+    elif event.type == "customer.subscription.updated":
+        subscription = event.data.object
+        user_id = subscription.metadata.get("user_id")
+
+        if user_id:
+            status = subscription.status
+            if status in _TRANSIENT_STATUSES:
+                logger.warning(f"Ignoring transient subscription status '{status}' for user {user_id}")
+                return
+            db_status = _STATUS_MAP.get(status)
+            if db_status is None:
+                logger.warning(f"Unknown subscription status '{status}' for user {user_id}, ignoring")
+                return
+
+            period_end = datetime.fromtimestamp(
+                stripe_service.get_period_end(subscription), tz=timezone.utc
+            )
+
+            await _apply_event(supabase, event.type, user_id, {
+                "subscription_status": db_status,
+                "current_period_end": period_end.isoformat(),
+            })
+            logger.info(f"Updated subscription status to {db_status} for user {user_id}")
+
+    elif event.type == "customer.subscription.deleted":
+        subscription = event.data.object
+        user_id = subscription.metadata.get("user_id")
+
+        if user_id:
+            await _apply_event(supabase, event.type, user_id, {})
+            logger.info(f"Subscription expired for user {user_id}")
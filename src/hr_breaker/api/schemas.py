@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # User schemas
@@ -116,6 +116,9 @@ class OptimizationListResponse(BaseModel):
 class FilterResultResponse(BaseModel):
     """Single filter result."""
 
+    # Not bound to a route; build the validator on first use, not at import
+    model_config = ConfigDict(defer_build=True)
+
     filter_name: str
     passed: bool
     score: float
@@ -127,6 +130,8 @@ class FilterResultResponse(BaseModel):
 class ValidationResultResponse(BaseModel):
     """Validation result with all filters."""
 
+    model_config = ConfigDict(defer_build=True)
+
     passed: bool
     results: list[FilterResultResponse]
 
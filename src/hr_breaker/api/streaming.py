@@ -0,0 +1,28 @@
+"""Streaming JSON responses for paginated listings."""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+
+async def stream_json_list(key: str, pages: AsyncIterator[list[dict[str, Any]]]) -> StreamingResponse:
+    """
+    Stream {"<key>": [...]} from pages of rows without buffering the whole list.
+
+    The first page is fetched before the response starts, so a failing query
+    still surfaces as a normal HTTP error rather than a truncated body.
+    """
+    first_page = await anext(pages, None)
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b'{"' + key.encode() + b'":['
+        page, separator = first_page, b""
+        while page:
+            yield separator + b",".join(map(orjson.dumps, page))
+            separator = b","
+            page = await anext(pages, None)
+        yield b"]}"
+
+    return StreamingResponse(body(), media_type="application/json")
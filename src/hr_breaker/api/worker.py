@@ -0,0 +1,40 @@
+"""arq worker that runs optimization jobs.
+
+Run with: uv run arq hr_breaker.api.worker.WorkerSettings
+"""
+
+from typing import Any
+
+from hr_breaker.api.job_queue import get_redis_settings
+from hr_breaker.api.routes.optimize import _run_optimization
+from hr_breaker.config import close_llm_http_client, get_settings
+from hr_breaker.services.scrapers import PlaywrightScraper
+from hr_breaker.services.supabase import SupabaseService
+
+
+async def run_optimization_job(ctx: dict[str, Any], **kwargs: Any) -> None:
+    """Run one optimization; kwargs match _run_optimization minus supabase."""
+    await _run_optimization(supabase=ctx["supabase"], **kwargs)
+
+
+async def startup(ctx: dict[str, Any]) -> None:
+    ctx["supabase"] = SupabaseService()
+
+
+async def shutdown(ctx: dict[str, Any]) -> None:
+    await ctx["supabase"].aclose()
+    await close_llm_http_client()
+    await PlaywrightScraper.shutdown()
+
+
+class WorkerSettings:
+    """arq worker configuration."""
+
+    functions = [run_optimization_job]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = get_redis_settings()
+    max_jobs = get_settings().worker_max_jobs
+    # Optimizations are not idempotent (quota already consumed), never retry
+    max_tries = 1
+    job_timeout = 30 * 60
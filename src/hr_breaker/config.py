@@ -1,11 +1,16 @@
 import logging
+import logging.handlers
 import os
+import queue
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
+import httpx
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from pydantic_ai.models.google import GoogleModel
+from pydantic_ai.providers.google import GoogleProvider
 
 load_dotenv()
 
@@ -28,6 +33,24 @@ def setup_logging() -> logging.Logger:
 logger = setup_logging()
 
 
+def start_queue_logging() -> logging.handlers.QueueListener:
+    """Hand root log records to a background thread so logging never blocks the event loop.
+
+    Moves the root logger's handlers behind a QueueHandler; call stop() on the
+    returned listener at shutdown to flush pending records.
+    """
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 class Settings(BaseModel):
     """Application settings."""
 
@@ -46,6 +69,8 @@ class Settings(BaseModel):
     supabase_anon_key: str = ""
     supabase_service_key: str = ""
     supabase_jwt_secret: str = ""
+    supabase_max_connections: int = 100
+    supabase_max_keepalive_connections: int = 50
     api_cors_origins: list[str] = ["http://localhost:3000"]
 
     # Stripe settings
@@ -55,7 +80,7 @@ class Settings(BaseModel):
     stripe_price_id_addon: str = ""
 
     # Paywall settings
-    unlimited_users: list[str] = []
+    unlimited_users: frozenset[str] = frozenset()
     trial_request_limit: int = 3
     subscription_request_limit: int = 50
     addon_request_count: int = 10
@@ -64,6 +89,7 @@ class Settings(BaseModel):
     scraper_httpx_timeout: float = 30.0
     scraper_wayback_timeout: float = 15.0
     scraper_playwright_timeout: int = 60000
+    scraper_playwright_max_contexts: int = 4
     scraper_httpx_max_retries: int = 3
     scraper_wayback_max_age_days: int = 30
     scraper_min_text_length: int = 200
@@ -91,6 +117,17 @@ class Settings(BaseModel):
     # Agent limits
     agent_name_extractor_chars: int = 2000
 
+    # LLM HTTP client settings
+    llm_max_connections: int = 500
+    llm_max_keepalive_connections: int = 200
+    llm_timeout: float = 120.0
+
+    # Job queue (optimizations run in an arq worker when set)
+    redis_url: str = ""
+    worker_max_jobs: int = 10
+    # Cap on in-process optimizations (used when no job queue is configured)
+    max_concurrent_optimizations: int = 4
+
 
 def _parse_cors_origins(value: str) -> list[str]:
     """Parse CORS origins from comma-separated string."""
@@ -99,11 +136,9 @@ def _parse_cors_origins(value: str) -> list[str]:
     return [origin.strip() for origin in value.split(",") if origin.strip()]
 
 
-def _parse_unlimited_users(value: str) -> list[str]:
-    """Parse unlimited users from comma-separated string."""
-    if not value:
-        return []
-    return [email.strip().lower() for email in value.split(",") if email.strip()]
+def _parse_unlimited_users(value: str) -> frozenset[str]:
+    """Parse unlimited users from comma-separated string (lowercased, for O(1) lookups)."""
+    return frozenset(email.strip().lower() for email in value.split(",") if email.strip())
 
 
 @lru_cache
@@ -122,6 +157,7 @@ def get_settings() -> Settings:
         scraper_httpx_timeout=float(os.getenv("SCRAPER_HTTPX_TIMEOUT", "30")),
         scraper_wayback_timeout=float(os.getenv("SCRAPER_WAYBACK_TIMEOUT", "15")),
         scraper_playwright_timeout=int(os.getenv("SCRAPER_PLAYWRIGHT_TIMEOUT", "60000")),
+        scraper_playwright_max_contexts=int(os.getenv("SCRAPER_PLAYWRIGHT_MAX_CONTEXTS", "4")),
         scraper_httpx_max_retries=int(os.getenv("SCRAPER_HTTPX_MAX_RETRIES", "3")),
         scraper_wayback_max_age_days=int(os.getenv("SCRAPER_WAYBACK_MAX_AGE_DAYS", "30")),
         scraper_min_text_length=int(os.getenv("SCRAPER_MIN_TEXT_LENGTH", "200")),
@@ -143,11 +179,21 @@ def get_settings() -> Settings:
         sentence_transformer_model=os.getenv("SENTENCE_TRANSFORMER_MODEL", "all-MiniLM-L6-v2"),
         # Agent limits
         agent_name_extractor_chars=int(os.getenv("AGENT_NAME_EXTRACTOR_CHARS", "2000")),
+        # LLM HTTP client settings
+        llm_max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "500")),
+        llm_max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "200")),
+        llm_timeout=float(os.getenv("LLM_TIMEOUT", "120")),
+        # Job queue settings
+        redis_url=os.getenv("REDIS_URL", ""),
+        worker_max_jobs=int(os.getenv("WORKER_MAX_JOBS", "10")),
+        max_concurrent_optimizations=int(os.getenv("MAX_CONCURRENT_OPTIMIZATIONS", "4")),
         # Supabase settings
         supabase_url=os.getenv("SUPABASE_URL", ""),
         supabase_anon_key=os.getenv("SUPABASE_ANON_KEY", ""),
         supabase_service_key=os.getenv("SUPABASE_SERVICE_KEY", ""),
         supabase_jwt_secret=os.getenv("SUPABASE_JWT_SECRET", ""),
+        supabase_max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100")),
+        supabase_max_keepalive_connections=int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "50")),
         api_cors_origins=_parse_cors_origins(os.getenv("API_CORS_ORIGINS", "")),
         # Stripe settings
         stripe_secret_key=os.getenv("STRIPE_SECRET_KEY", ""),
@@ -172,3 +218,33 @@ def get_model_settings() -> dict[str, Any] | None:
             }
         }
     return None
+
+
+@lru_cache
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Shared HTTP client for all LLM agents, with a pool sized for concurrent runs."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+        ),
+        timeout=httpx.Timeout(settings.llm_timeout),
+    )
+
+
+async def close_llm_http_client() -> None:
+    """Close the shared LLM HTTP client (called on app shutdown)."""
+    if get_llm_http_client.cache_info().currsize:
+        await get_llm_http_client().aclose()
+        get_llm_http_client.cache_clear()
+
+
+def get_model(model_name: str) -> GoogleModel:
+    """Build a Gemini model that uses the shared LLM HTTP client."""
+    settings = get_settings()
+    provider = GoogleProvider(
+        api_key=settings.google_api_key or None,
+        http_client=get_llm_http_client(),
+    )
+    return GoogleModel(model_name, provider=provider)
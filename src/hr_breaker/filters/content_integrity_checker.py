@@ -23,7 +23,7 @@ class ContentIntegrityChecker(BaseFilter):
         source: ResumeSource,
     ) -> FilterResult:
         hallucination_result, ai_result = await check_content_integrity(
-            optimized, source
+            optimized, source, full=False
         )
 
         # Combine results: pass only if both checks pass
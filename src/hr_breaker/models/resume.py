@@ -1,5 +1,6 @@
 import hashlib
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 from typing import Any
 
@@ -46,3 +47,8 @@ class OptimizedResume(BaseModel):
     pdf_text: str | None = None
     pdf_bytes: bytes | None = None
     pdf_path: Path | None = None
+
+    @cached_property
+    def serialized(self) -> str:
+        """Compact JSON of `data`, computed once per instance ("" if no data)."""
+        return self.data.model_dump_json() if self.data else ""
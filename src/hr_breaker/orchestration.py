@@ -1,11 +1,10 @@
 """Core optimization loop - used by both CLI and Streamlit."""
 
 import asyncio
-import tempfile
+import inspect
 import time
 from collections.abc import Callable
 from contextlib import contextmanager
-from pathlib import Path
 
 from hr_breaker.agents import optimize_resume, parse_job_posting
 from hr_breaker.config import get_settings, logger
@@ -120,7 +119,7 @@ async def optimize_for_job(
         source: Source resume
         job_text: Job posting text (required if job not provided)
         max_iterations: Max optimization iterations (default from settings)
-        on_iteration: Optional callback(iteration, optimized, validation)
+        on_iteration: Optional callback(iteration, optimized, validation), sync or async
         job: Pre-parsed job posting (optional, skips parsing if provided)
 
     Returns:
@@ -157,9 +156,7 @@ async def optimize_for_job(
             optimized = await optimize_resume(source, job, ctx)
         print(f"  📝 Changes: {optimized.changes[:100]}..." if len(optimized.changes) > 100 else f"  📝 Changes: {optimized.changes}")
         # Store last attempt for feedback (html or data depending on mode)
-        last_attempt = optimized.html if optimized.html else (
-            optimized.data.model_dump_json() if optimized.data else None
-        )
+        last_attempt = optimized.html if optimized.html else (optimized.serialized or None)
 
         # Render PDF and extract text for filters (like real ATS)
         optimized = _render_and_extract(optimized, renderer)
@@ -188,7 +185,9 @@ async def optimize_for_job(
         print(f"  ⏱️  Iteration {i + 1} total: {iter_elapsed:.2f}s")
 
         if on_iteration:
-            on_iteration(i, optimized, validation)
+            callback_result = on_iteration(i, optimized, validation)
+            if inspect.isawaitable(callback_result):
+                await callback_result
 
         if validation.passed:
             print(f"  ✅ All filters passed!")
@@ -210,15 +209,8 @@ def _render_and_extract(optimized: OptimizedResume, renderer) -> OptimizedResume
                 raise RenderError("No content to render (neither html nor data)")
 
         # Extract text from rendered PDF
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
-            f.write(result.pdf_bytes)
-            pdf_path = Path(f.name)
-
-        try:
-            with log_time("extract_text_from_pdf"):
-                pdf_text = extract_text_from_pdf(pdf_path)
-        finally:
-            pdf_path.unlink()
+        with log_time("extract_text_from_pdf"):
+            pdf_text = extract_text_from_pdf(result.pdf_bytes)
 
         return optimized.model_copy(
             update={"pdf_text": pdf_text, "pdf_bytes": result.pdf_bytes}
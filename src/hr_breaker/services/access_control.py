@@ -7,6 +7,28 @@ from typing import Any
 from hr_breaker.config import get_settings, logger
 
 
+@dataclass(slots=True)
+class UserQuota:
+    """Quota-related fields of a user's profile."""
+
+    subscription_status: str = "trial"
+    current_period_end: datetime | None = None
+    period_request_count: int = 0
+    addon_credits: int = 0
+    request_count: int = 0
+
+    @classmethod
+    def from_profile(cls, profile: dict[str, Any]) -> "UserQuota":
+        """Build from a profile loaded with SupabaseService.get_profile."""
+        return cls(
+            subscription_status=profile.get("subscription_status", "trial"),
+            current_period_end=profile.get("current_period_end"),
+            period_request_count=profile.get("period_request_count", 0),
+            addon_credits=profile.get("addon_credits", 0),
+            request_count=profile.get("request_count", 0),
+        )
+
+
 @dataclass
 class AccessResult:
     """Result of an access check."""
@@ -21,13 +43,13 @@ class AccessResult:
     renewal_date: datetime | None = None
 
 
-def check_access(user_email: str, profile: dict[str, Any]) -> AccessResult:
+def check_access(user_email: str, quota: UserQuota) -> AccessResult:
     """
     Check if a user has access to make optimization requests.
 
     Args:
         user_email: The user's email address
-        profile: The user's profile data from database
+        quota: The user's quota fields from their profile
 
     Returns:
         AccessResult with access decision and details
@@ -35,20 +57,15 @@ def check_access(user_email: str, profile: dict[str, Any]) -> AccessResult:
     settings = get_settings()
 
     # 1. Admin override - unlimited access
-    logger.info(f"Checking access for email='{user_email}', unlimited_users={settings.unlimited_users}")
     if user_email.lower() in settings.unlimited_users:
-        logger.info(f"User {user_email} has unlimited access")
+        logger.debug(f"User {user_email} has unlimited access")
         return AccessResult(allowed=True, unlimited=True)
 
-    subscription_status = profile.get("subscription_status", "trial")
-    current_period_end = profile.get("current_period_end")
-    period_request_count = profile.get("period_request_count", 0)
-    addon_credits = profile.get("addon_credits", 0)
-    request_count = profile.get("request_count", 0)
-
-    # Parse current_period_end if it's a string
-    if isinstance(current_period_end, str):
-        current_period_end = datetime.fromisoformat(current_period_end.replace("Z", "+00:00"))
+    subscription_status = quota.subscription_status
+    current_period_end = quota.current_period_end
+    period_request_count = quota.period_request_count
+    addon_credits = quota.addon_credits
+    request_count = quota.request_count
 
     now = datetime.now(timezone.utc)
 
@@ -90,13 +107,13 @@ def check_access(user_email: str, profile: dict[str, Any]) -> AccessResult:
     )
 
 
-def consume_request(user_email: str, profile: dict[str, Any]) -> dict[str, Any]:
+def consume_request(user_email: str, quota: UserQuota) -> dict[str, Any]:
     """
     Calculate the profile updates needed after consuming a request.
 
     Args:
         user_email: The user's email address
-        profile: The user's profile data from database
+        quota: The user's quota fields from their profile
 
     Returns:
         Dict of fields to update in the profile
@@ -107,10 +124,10 @@ def consume_request(user_email: str, profile: dict[str, Any]) -> dict[str, Any]:
     if user_email.lower() in settings.unlimited_users:
         return {}
 
-    subscription_status = profile.get("subscription_status", "trial")
-    period_request_count = profile.get("period_request_count", 0)
-    addon_credits = profile.get("addon_credits", 0)
-    request_count = profile.get("request_count", 0)
+    subscription_status = quota.subscription_status
+    period_request_count = quota.period_request_count
+    addon_credits = quota.addon_credits
+    request_count = quota.request_count
 
     if subscription_status == "active":
         # Subscriber: use period quota first, then addon credits
@@ -5,16 +5,19 @@ from pathlib import Path
 import fitz  # pymupdf
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extract text from PDF file.
+def extract_text_from_pdf(pdf: Path | bytes) -> str:
+    """Extract text from PDF file or in-memory PDF bytes.
 
     Args:
-        pdf_path: Path to PDF file
+        pdf: Path to PDF file, or raw PDF bytes
 
     Returns:
         Extracted text content
     """
-    doc = fitz.open(pdf_path)
+    if isinstance(pdf, bytes):
+        doc = fitz.open(stream=pdf, filetype="pdf")
+    else:
+        doc = fitz.open(pdf)
     text_parts = []
 
     for page in doc:
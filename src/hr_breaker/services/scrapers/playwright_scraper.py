@@ -1,5 +1,12 @@
 import asyncio
+import concurrent.futures
 import logging
+import threading
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from hr_breaker.config import get_settings
 
 from .base import BaseScraper, CloudflareBlockedError, ScrapingError
 
@@ -15,14 +22,138 @@ except ImportError:
     PlaywrightTimeout = None
 
 
+# Playwright objects belong to the loop that created them, so the shared
+# browser lives on one background loop that every scrape is sent to.
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Start the background browser loop on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="playwright", daemon=True).start()
+            _loop = loop
+    return _loop
+
+
 class PlaywrightScraper(BaseScraper):
-    """Browser-based scraper using Playwright."""
+    """Browser-based scraper using Playwright.
+
+    One Chromium instance is launched lazily and shared by all scrapes.
+    Configured browser contexts are pooled and reused (at most
+    scraper_playwright_max_contexts at a time); each scrape only opens a page.
+    """
 
     name = "playwright"
 
+    # Stealth settings to avoid bot detection
+    _LAUNCH_ARGS = [
+        "--disable-blink-features=AutomationControlled",
+        "--disable-dev-shm-usage",
+        "--no-sandbox",
+    ]
+    _CONTEXT_KWARGS: dict[str, Any] = {
+        "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36",
+        "locale": "en-US",
+        "timezone_id": "America/New_York",
+        "viewport": {"width": 1920, "height": 1080},
+        "extra_http_headers": {
+            "Accept-Language": "en-US,en;q=0.9",
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Connection": "keep-alive",
+            "Upgrade-Insecure-Requests": "1",
+            "Sec-Fetch-Dest": "document",
+            "Sec-Fetch-Mode": "navigate",
+            "Sec-Fetch-Site": "none",
+            "Sec-Fetch-User": "?1",
+        },
+    }
+    # Remove webdriver property
+    _INIT_SCRIPT = "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"
+
+    # Shared browser and context pool, only touched from the background loop
+    _playwright: Any = None
+    _browser: Any = None
+    _browser_lock: asyncio.Lock | None = None
+    _context_slots: asyncio.Semaphore | None = None
+    _idle_contexts: list[Any] = []
+
     def __init__(self, timeout: float = 60000):  # ms for playwright
         self.timeout = timeout
 
+    @classmethod
+    async def _get_browser(cls) -> Any:
+        if cls._browser_lock is None:
+            cls._browser_lock = asyncio.Lock()
+            cls._context_slots = asyncio.Semaphore(get_settings().scraper_playwright_max_contexts)
+        async with cls._browser_lock:
+            if cls._browser is None or not cls._browser.is_connected():
+                if cls._playwright is None:
+                    cls._playwright = await async_playwright().start()
+                cls._browser = await cls._playwright.chromium.launch(
+                    headless=True, args=cls._LAUNCH_ARGS
+                )
+        return cls._browser
+
+    @classmethod
+    @asynccontextmanager
+    async def _context(cls) -> AsyncIterator[Any]:
+        """Borrow a pooled browser context, creating one if none is idle."""
+        browser = await cls._get_browser()
+        async with cls._context_slots:
+            context = cls._idle_contexts.pop() if cls._idle_contexts else None
+            if context is None or context.browser is not browser:
+                context = await browser.new_context(**cls._CONTEXT_KWARGS)
+                await context.add_init_script(cls._INIT_SCRIPT)
+            try:
+                yield context
+            except BaseException:
+                # The context may be broken; don't hand it to the next scrape
+                await asyncio.shield(cls._discard_context(context))
+                raise
+            # Contexts of a relaunched browser are dropped, not reused
+            if context.browser is not cls._browser:
+                return
+            # Don't carry one site's cookies or granted permissions into the next scrape
+            try:
+                await context.clear_cookies()
+                await context.clear_permissions()
+            except Exception as e:
+                logger.debug(f"Failed to reset browser context: {e}")
+                await cls._discard_context(context)
+                return
+            cls._idle_contexts.append(context)
+
+    @staticmethod
+    async def _discard_context(context: Any) -> None:
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"Failed to close browser context: {e}")
+
+    @classmethod
+    async def _close_browser(cls) -> None:
+        browser, playwright = cls._browser, cls._playwright
+        cls._browser = cls._playwright = None
+        cls._idle_contexts.clear()
+        if browser is not None:
+            await browser.close()
+        if playwright is not None:
+            await playwright.stop()
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """Close the shared browser (call on app shutdown)."""
+        if _loop is None:
+            return
+        await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(cls._close_browser(), _loop))
+
     async def scrape_async(self, url: str) -> str:
         """Scrape job posting using headless browser (async)."""
         if not PLAYWRIGHT_AVAILABLE:
@@ -31,46 +162,16 @@ class PlaywrightScraper(BaseScraper):
                 "uv pip install 'hr-breaker[browser]' && playwright install chromium"
             )
 
+        loop = _get_loop()
+        if asyncio.get_running_loop() is not loop:
+            return await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self.scrape_async(url), loop)
+            )
+
         try:
-            async with async_playwright() as p:
-                # Launch with stealth settings to avoid detection
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        "--disable-blink-features=AutomationControlled",
-                        "--disable-dev-shm-usage",
-                        "--no-sandbox",
-                    ],
-                )
+            async with self._context() as context:
+                page = await context.new_page()
                 try:
-                    context = await browser.new_context(
-                        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                        "AppleWebKit/537.36 (KHTML, like Gecko) "
-                        "Chrome/120.0.0.0 Safari/537.36",
-                        locale="en-US",
-                        timezone_id="America/New_York",
-                        viewport={"width": 1920, "height": 1080},
-                        extra_http_headers={
-                            "Accept-Language": "en-US,en;q=0.9",
-                            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                            "Accept-Encoding": "gzip, deflate, br",
-                            "Connection": "keep-alive",
-                            "Upgrade-Insecure-Requests": "1",
-                            "Sec-Fetch-Dest": "document",
-                            "Sec-Fetch-Mode": "navigate",
-                            "Sec-Fetch-Site": "none",
-                            "Sec-Fetch-User": "?1",
-                        },
-                    )
-                    page = await context.new_page()
-
-                    # Remove webdriver property to avoid detection
-                    await page.add_init_script("""
-                        Object.defineProperty(navigator, 'webdriver', {
-                            get: () => undefined
-                        });
-                    """)
-
                     # Try domcontentloaded first (faster), fallback to load
                     try:
                         await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
@@ -81,15 +182,15 @@ class PlaywrightScraper(BaseScraper):
                         await page.goto(url, wait_until="load", timeout=self.timeout)
 
                     html = await page.content()
+                finally:
+                    await page.close()
 
-                    if self.is_cloudflare_blocked(html):
-                        raise CloudflareBlockedError(
-                            f"Cloudflare blocked even with browser: {url}"
-                        )
+            if self.is_cloudflare_blocked(html):
+                raise CloudflareBlockedError(
+                    f"Cloudflare blocked even with browser: {url}"
+                )
 
-                    return self.extract_job_text(html)
-                finally:
-                    await browser.close()
+            return self.extract_job_text(html)
         except PlaywrightTimeout:
             raise ScrapingError(f"Playwright timeout loading {url}")
         except Exception as e:
@@ -99,17 +200,11 @@ class PlaywrightScraper(BaseScraper):
 
     def scrape(self, url: str) -> str:
         """Scrape job posting using headless browser (sync wrapper)."""
+        future = asyncio.run_coroutine_threadsafe(self.scrape_async(url), _get_loop())
+        # Both page loads may time out, plus the fixed render wait and launch
+        timeout = self.timeout / 1000 * 2 + 30
         try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = None
-
-        if loop is not None:
-            # Already in async context - run in thread pool to avoid blocking
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, self.scrape_async(url))
-                return future.result()
-        else:
-            # No async loop - run directly
-            return asyncio.run(self.scrape_async(url))
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise ScrapingError(f"Playwright timeout loading {url}")
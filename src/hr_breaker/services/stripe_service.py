@@ -20,7 +20,8 @@ class StripeService:
         settings = get_settings()
         if not settings.stripe_secret_key:
             raise StripeError("Stripe secret key is required")
-        stripe.api_key = settings.stripe_secret_key
+        if stripe.api_key != settings.stripe_secret_key:
+            stripe.api_key = settings.stripe_secret_key
         self._webhook_secret = settings.stripe_webhook_secret
 
     def create_checkout_session_subscription(
@@ -131,6 +132,14 @@ class StripeService:
             logger.error(f"Failed to retrieve subscription: {e}")
             raise StripeError(f"Failed to retrieve subscription: {e}") from e
 
+    def resolve_subscription(
+        self, subscription: str | stripe.Subscription
+    ) -> stripe.Subscription:
+        """Return an expanded subscription as-is, fetching it only when given an ID."""
+        if isinstance(subscription, str):
+            return self.get_subscription(subscription)
+        return subscription
+
     @staticmethod
     def get_period_end(subscription: stripe.Subscription) -> int:
         """
@@ -154,9 +163,9 @@ class StripeService:
         )
 
     def retrieve_checkout_session(self, session_id: str) -> stripe.checkout.Session:
-        """Retrieve a checkout session by ID."""
+        """Retrieve a checkout session by ID, with its subscription expanded."""
         try:
-            return stripe.checkout.Session.retrieve(session_id)
+            return stripe.checkout.Session.retrieve(session_id, expand=["subscription"])
         except stripe.StripeError as e:
             logger.error(f"Failed to retrieve checkout session: {e}")
             raise StripeError(f"Failed to retrieve checkout session: {e}") from e
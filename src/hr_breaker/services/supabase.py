@@ -1,63 +1,266 @@
 """Supabase client wrapper for database and storage operations."""
 
-from datetime import datetime
+import asyncio
+import os
+import random
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from datetime import datetime, timedelta, timezone
 from typing import Any
-from uuid import uuid4
+from uuid import UUID
 
-from supabase import create_client, Client
+import httpx
+import orjson
+from supabase import AsyncClient, AsyncClientOptions
 
 from hr_breaker.config import get_settings, logger
 
 
+# Rows fetched per Range request when listing
+LIST_PAGE_SIZE = 200
+
+# Profile and CV reads are cached in-process for a short time; writes made
+# through this service invalidate them immediately
+READ_CACHE_TTL = 30.0
+PROFILE_CACHE_SIZE = 10_000
+# CV rows carry the full content_text, so far fewer of them are kept
+CV_CACHE_SIZE = 256
+
+# Storage deletes run after the response; transient failures are retried with backoff
+STORAGE_DELETE_ATTEMPTS = 3
+STORAGE_DELETE_BACKOFF = 0.5
+
+# Transient HTTP failures are retried with jittered exponential backoff
+HTTP_RETRY_ATTEMPTS = 3
+HTTP_RETRY_BACKOFF = 0.1
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Storage content types for uploaded CV extensions
+_CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "txt": "text/plain",
+    "tex": "text/x-tex",
+    "md": "text/markdown",
+    "html": "text/html",
+}
+
+
+def _uuid7() -> str:
+    """Time-ordered UUIDv7, so new primary keys land at the end of the index instead of a random page."""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), "big")
+    value = value & ~(0xF << 76) | 0x7 << 76  # version 7
+    value = value & ~(0x3 << 62) | 0x2 << 62  # RFC 9562 variant
+    return str(UUID(int=value))
+
+
 class SupabaseError(Exception):
     """Supabase operation error."""
 
     pass
 
 
+class _OrjsonAsyncClient(httpx.AsyncClient):
+    """httpx client that encodes JSON request bodies with orjson.
+
+    PostgREST payloads such as CV text and run results go through here, and
+    orjson is several times faster than the stdlib encoder httpx uses.
+    """
+
+    def build_request(self, method: str, url: Any, *, json: Any | None = None, **kwargs: Any) -> httpx.Request:
+        if json is not None and kwargs.get("content") is None:
+            headers = httpx.Headers(kwargs.get("headers"))
+            headers["Content-Type"] = "application/json"
+            kwargs["headers"] = headers
+            kwargs["content"] = orjson.dumps(json)
+        return super().build_request(method, url, **kwargs)
+
+
+class _RetryTransport(httpx.AsyncHTTPTransport):
+    """Transport that retries transient failures with jittered exponential backoff.
+
+    Failures before the request is sent (connect errors, pool timeouts) are
+    retried for any method. Gateway errors and dropped connections are only
+    retried for idempotent methods, so RPCs and inserts are never applied twice.
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in _IDEMPOTENT_METHODS
+        for attempt in range(HTTP_RETRY_ATTEMPTS - 1):
+            try:
+                response = await super().handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                pass
+            except (httpx.RemoteProtocolError, httpx.ReadError):
+                if not idempotent:
+                    raise
+            else:
+                if not idempotent or response.status_code not in _RETRY_STATUSES:
+                    return response
+                await response.aclose()
+            await asyncio.sleep(random.uniform(0, HTTP_RETRY_BACKOFF * 2**attempt))
+        return await super().handle_async_request(request)
+
+
+class _ReadCache:
+    """Cache of row dicts whose entries expire after a TTL.
+
+    Entries are kept in insertion order, so expired ones are swept from the
+    front on every insert instead of lingering until they are read again.
+
+    Concurrent misses for the same key share one in-flight load.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[Hashable, tuple[int, asyncio.Future]] = {}
+        # Bumped on every invalidation so a read that raced a write isn't stored
+        self.generation = 0
+
+    async def get_or_load(
+        self, key: Hashable, load: Callable[[], Awaitable[dict[str, Any] | None]]
+    ) -> dict[str, Any] | None:
+        row = self.get(key)
+        if row is not None:
+            return row
+        # Only join a load that started after the latest write
+        generation, future = self._inflight.get(key, (None, None))
+        if future is None or generation != self.generation:
+            generation = self.generation
+            future = asyncio.ensure_future(self._load(key, load, generation))
+            self._inflight[key] = (generation, future)
+            future.add_done_callback(lambda done: self._end_load(key, done))
+        # Shielded so one cancelled caller doesn't cancel the load for the others
+        row = await asyncio.shield(future)
+        return dict(row) if row is not None else None
+
+    async def _load(
+        self, key: Hashable, load: Callable[[], Awaitable[dict[str, Any] | None]], generation: int
+    ) -> dict[str, Any] | None:
+        row = await load()
+        if row is not None:
+            self.set(key, row, generation)
+        return row
+
+    def _end_load(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key, (None, None))[1] is future:
+            del self._inflight[key]
+
+    def get(self, key: Hashable) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, row = entry
+        if time.monotonic() - stored_at >= self._ttl:
+            del self._entries[key]
+            return None
+        return dict(row)
+
+    def set(self, key: Hashable, row: dict[str, Any], generation: int) -> None:
+        if generation != self.generation:
+            return
+        now = time.monotonic()
+        self._entries.pop(key, None)
+        self._entries[key] = (now, dict(row))
+        while self._entries:
+            stored_at, _ = next(iter(self._entries.values()))
+            if now - stored_at < self._ttl and len(self._entries) <= self._maxsize:
+                break
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.generation += 1
+        self._entries.pop(key, None)
+
+
 class SupabaseService:
-    """Wrapper for Supabase database and storage operations."""
+    """
+    Wrapper for Supabase database and storage operations.
+
+    Holds no per-request state, so one instance is shared per process (see
+    api.deps.get_supabase_service) and its pooled client serves concurrent calls.
+    """
 
     def __init__(self):
         settings = get_settings()
         if not settings.supabase_url or not settings.supabase_service_key:
             raise SupabaseError("Supabase URL and service key are required")
 
-        self._client: Client = create_client(
+        # One pooled HTTP client shared by PostgREST and Storage, so calls reuse
+        # keep-alive connections instead of paying a TLS handshake each time
+        self._http = _OrjsonAsyncClient(
+            transport=_RetryTransport(
+                limits=httpx.Limits(
+                    max_connections=settings.supabase_max_connections,
+                    max_keepalive_connections=settings.supabase_max_keepalive_connections,
+                    keepalive_expiry=30.0,
+                ),
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0, pool=5.0),
+            follow_redirects=True,
+        )
+
+        # No session to restore with the service key, so the async client can be built directly
+        self._client = AsyncClient(
             settings.supabase_url,
             settings.supabase_service_key,
+            options=AsyncClientOptions(httpx_client=self._http),
         )
 
+        self._profile_cache = _ReadCache(PROFILE_CACHE_SIZE, READ_CACHE_TTL)
+        self._cv_cache = _ReadCache(CV_CACHE_SIZE, READ_CACHE_TTL)
+        self._background: set[asyncio.Task] = set()
+
     @property
-    def client(self) -> Client:
+    def client(self) -> AsyncClient:
         """Get the Supabase client."""
         return self._client
 
+    async def aclose(self) -> None:
+        """Finish pending storage deletes, then close the pooled HTTP connections."""
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+        await self._http.aclose()
+
     # Profile operations
-    def get_profile(self, user_id: str) -> dict[str, Any] | None:
-        """Get user profile by ID."""
+    async def get_profile(self, user_id: str) -> dict[str, Any] | None:
+        """Get user profile by ID, with current_period_end parsed to a datetime."""
+        return await self._profile_cache.get_or_load(user_id, lambda: self._load_profile(user_id))
+
+    async def _load_profile(self, user_id: str) -> dict[str, Any] | None:
         try:
-            result = (
+            result = await (
                 self._client.table("profiles")
                 .select("*")
                 .eq("id", user_id)
-                .single()
+                .maybe_single()
                 .execute()
             )
-            return result.data
+            if result is None:
+                return None
+            profile = result.data
+            if isinstance(profile.get("current_period_end"), str):
+                profile["current_period_end"] = datetime.fromisoformat(
+                    profile["current_period_end"].replace("Z", "+00:00")
+                )
+            return profile
         except Exception as e:
             logger.warning(f"Failed to get profile: {e}")
             return None
 
-    def update_profile(self, user_id: str, data: dict[str, Any]) -> dict[str, Any]:
+    async def update_profile(self, user_id: str, data: dict[str, Any]) -> dict[str, Any]:
         """Update user profile. Raises SupabaseError if no matching profile found."""
         try:
-            result = (
+            result = await (
                 self._client.table("profiles")
                 .update(data)
                 .eq("id", user_id)
                 .execute()
             )
+            self._profile_cache.invalidate(user_id)
             if not result.data:
                 raise SupabaseError(f"No profile found for user_id={user_id}")
             return result.data[0]
@@ -67,10 +270,10 @@ class SupabaseService:
             logger.error(f"Failed to update profile: {e}")
             raise SupabaseError(f"Failed to update profile: {e}") from e
 
-    def create_profile(self, user_id: str, email: str, name: str | None = None) -> dict[str, Any]:
+    async def create_profile(self, user_id: str, email: str, name: str | None = None) -> dict[str, Any]:
         """Create user profile."""
         try:
-            result = (
+            result = await (
                 self._client.table("profiles")
                 .insert({
                     "id": user_id,
@@ -80,55 +283,76 @@ class SupabaseService:
                 })
                 .execute()
             )
+            self._profile_cache.invalidate(user_id)
             return result.data[0]
         except Exception as e:
             logger.error(f"Failed to create profile: {e}")
             raise SupabaseError(f"Failed to create profile: {e}") from e
 
     # CV operations
-    def list_cvs(self, user_id: str) -> list[dict[str, Any]]:
-        """List all CVs for a user."""
-        try:
-            result = (
+    def iter_cvs(self, user_id: str, page_size: int = LIST_PAGE_SIZE) -> AsyncIterator[list[dict[str, Any]]]:
+        """List a user's CVs newest first, one page of rows at a time."""
+        return self._paginate(
+            lambda: (
                 self._client.table("cvs")
                 .select("id, name, original_filename, created_at")
                 .eq("user_id", user_id)
                 .order("created_at", desc=True)
+                .order("id")
+            ),
+            page_size,
+            "list CVs",
+        )
+
+    async def get_cv(self, cv_id: str, user_id: str) -> dict[str, Any] | None:
+        """Get a CV by ID (with user ownership check)."""
+        cv = await self._cv_cache.get_or_load(cv_id, lambda: self._load_cv(cv_id))
+        # Loaded by id alone so loads are shared across callers; ownership is checked here
+        return cv if cv and cv["user_id"] == user_id else None
+
+    async def _load_cv(self, cv_id: str) -> dict[str, Any] | None:
+        try:
+            result = await (
+                self._client.table("cvs")
+                .select("*")
+                .eq("id", cv_id)
+                .maybe_single()
                 .execute()
             )
-            return result.data
+            return result.data if result else None
         except Exception as e:
-            logger.error(f"Failed to list CVs: {e}")
-            raise SupabaseError(f"Failed to list CVs: {e}") from e
+            logger.warning(f"Failed to get CV: {e}")
+            return None
 
-    def get_cv(self, cv_id: str, user_id: str) -> dict[str, Any] | None:
-        """Get a CV by ID (with user ownership check)."""
+    async def get_cv_by_hash(self, user_id: str, content_hash: str) -> dict[str, Any] | None:
+        """Get a user's CV by the SHA-256 hash of its uploaded file."""
         try:
-            result = (
+            result = await (
                 self._client.table("cvs")
                 .select("*")
-                .eq("id", cv_id)
                 .eq("user_id", user_id)
-                .single()
+                .eq("content_hash", content_hash)
+                .limit(1)
                 .execute()
             )
-            return result.data
+            return result.data[0] if result.data else None
         except Exception as e:
-            logger.warning(f"Failed to get CV: {e}")
+            logger.warning(f"Failed to get CV by hash: {e}")
             return None
 
-    def create_cv(
+    async def create_cv(
         self,
         user_id: str,
         name: str,
         file_path: str,
         original_filename: str,
         content_text: str,
+        content_hash: str | None = None,
     ) -> dict[str, Any]:
         """Create a new CV record."""
-        cv_id = str(uuid4())
+        cv_id = _uuid7()
         try:
-            result = (
+            result = await (
                 self._client.table("cvs")
                 .insert({
                     "id": cv_id,
@@ -137,6 +361,7 @@ class SupabaseService:
                     "file_path": file_path,
                     "original_filename": original_filename,
                     "content_text": content_text,
+                    "content_hash": content_hash,
                 })
                 .execute()
             )
@@ -145,31 +370,75 @@ class SupabaseService:
             logger.error(f"Failed to create CV: {e}")
             raise SupabaseError(f"Failed to create CV: {e}") from e
 
-    def delete_cv(self, cv_id: str, user_id: str) -> bool:
+    async def update_cv(self, cv_id: str, data: dict[str, Any]) -> None:
+        """Update a CV record."""
+        try:
+            await self._client.table("cvs").update(data).eq("id", cv_id).execute()
+            self._cv_cache.invalidate(cv_id)
+        except Exception as e:
+            logger.error(f"Failed to update CV: {e}")
+            raise SupabaseError(f"Failed to update CV: {e}") from e
+
+    async def delete_cv(self, cv_id: str, user_id: str) -> bool:
         """Delete a CV (with user ownership check)."""
         try:
-            # First get the CV to check ownership and get file path
-            cv = self.get_cv(cv_id, user_id)
-            if not cv:
-                return False
-
-            # Delete from database
-            self._client.table("cvs").delete().eq("id", cv_id).execute()
-
-            # Delete from storage
-            if cv.get("file_path"):
-                try:
-                    self._client.storage.from_("cvs").remove([cv["file_path"]])
-                except Exception as e:
-                    logger.warning(f"Failed to delete CV file from storage: {e}")
-
-            return True
+            # Ownership check and delete in one call (delete_cv function); returns the storage path
+            result = await self._client.rpc(
+                "delete_cv",
+                {
+                    "p_cv_id": cv_id,
+                    "p_user_id": user_id,
+                }
+            ).execute()
         except Exception as e:
             logger.error(f"Failed to delete CV: {e}")
             raise SupabaseError(f"Failed to delete CV: {e}") from e
 
+        file_path = result.data
+        if not file_path:
+            return False
+        self._cv_cache.invalidate(cv_id)
+
+        # Only remove the file once its row is gone, so a CV never points at a missing file
+        self._remove_file_later("cvs", file_path)
+        return True
+
+    async def _paginate(
+        self, build_query: Callable[[], Any], page_size: int, action: str
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Yield non-empty pages of a query using Range requests until a short page."""
+        offset = 0
+        while True:
+            try:
+                result = await build_query().range(offset, offset + page_size - 1).execute()
+            except Exception as e:
+                logger.error(f"Failed to {action}: {e}")
+                raise SupabaseError(f"Failed to {action}: {e}") from e
+            if result.data:
+                yield result.data
+            if len(result.data) < page_size:
+                return
+            offset += page_size
+
     # Storage operations
-    def upload_cv_file(
+    def _remove_file_later(self, bucket: str, file_path: str) -> None:
+        """Delete a storage file in the background, without holding up the caller."""
+        task = asyncio.create_task(self._remove_file(bucket, file_path))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _remove_file(self, bucket: str, file_path: str) -> None:
+        for attempt in range(STORAGE_DELETE_ATTEMPTS):
+            try:
+                await self._client.storage.from_(bucket).remove([file_path])
+                return
+            except Exception as e:
+                if attempt == STORAGE_DELETE_ATTEMPTS - 1:
+                    logger.warning(f"Failed to delete {bucket}/{file_path} from storage: {e}")
+                    return
+                await asyncio.sleep(STORAGE_DELETE_BACKOFF * 2**attempt)
+
+    async def upload_cv_file(
         self,
         user_id: str,
         file_content: bytes,
@@ -181,12 +450,13 @@ class SupabaseService:
         Returns:
             The storage path of the uploaded file
         """
-        cv_id = str(uuid4())
-        ext = filename.rsplit(".", 1)[-1] if "." in filename else "txt"
+        cv_id = _uuid7()
+        _, dot, ext = filename.rpartition(".")
+        ext = ext.lower() if dot else "txt"
         file_path = f"{user_id}/cvs/{cv_id}.{ext}"
 
         try:
-            self._client.storage.from_("cvs").upload(
+            await self._client.storage.from_("cvs").upload(
                 file_path,
                 file_content,
                 file_options={"content-type": self._get_content_type(ext)},
@@ -196,26 +466,26 @@ class SupabaseService:
             logger.error(f"Failed to upload CV file: {e}")
             raise SupabaseError(f"Failed to upload CV file: {e}") from e
 
-    def download_cv_file(self, file_path: str) -> bytes:
+    async def download_cv_file(self, file_path: str) -> bytes:
         """Download a CV file from storage."""
         try:
-            response = self._client.storage.from_("cvs").download(file_path)
+            response = await self._client.storage.from_("cvs").download(file_path)
             return response
         except Exception as e:
             logger.error(f"Failed to download CV file: {e}")
             raise SupabaseError(f"Failed to download CV file: {e}") from e
 
     # Optimization run operations
-    def create_optimization_run(
+    async def create_optimization_run(
         self,
         user_id: str,
         cv_id: str,
         job_input: str,
     ) -> dict[str, Any]:
         """Create a new optimization run."""
-        run_id = str(uuid4())
+        run_id = _uuid7()
         try:
-            result = (
+            result = await (
                 self._client.table("optimization_runs")
                 .insert({
                     "id": run_id,
@@ -232,41 +502,100 @@ class SupabaseService:
             logger.error(f"Failed to create optimization run: {e}")
             raise SupabaseError(f"Failed to create optimization run: {e}") from e
 
-    def get_optimization_run(self, run_id: str, user_id: str) -> dict[str, Any] | None:
-        """Get an optimization run by ID (with user ownership check)."""
+    async def start_optimization_run(
+        self,
+        user_id: str,
+        cv_id: str,
+        job_input: str,
+        consume: bool,
+        is_subscriber: bool,
+        subscription_limit: int = 50,
+    ) -> str | None:
+        """
+        Consume a request (if consume is set) and create a pending run atomically.
+
+        Returns:
+            The new run ID, or None if no quota was available
+        """
+        run_id = _uuid7()
+        try:
+            result = await self._client.rpc(
+                "start_optimization",
+                {
+                    "p_run_id": run_id,
+                    "p_user_id": user_id,
+                    "p_cv_id": cv_id,
+                    "p_job_input": job_input,
+                    "p_consume": consume,
+                    "p_is_subscriber": is_subscriber,
+                    "p_subscription_limit": subscription_limit,
+                }
+            ).execute()
+            self._profile_cache.invalidate(user_id)
+            return run_id if result.data is True else None
+        except Exception as e:
+            logger.error(f"Failed to start optimization run: {e}")
+            raise SupabaseError(f"Failed to start optimization run: {e}") from e
+
+    async def get_optimization_run(self, run_id: str, user_id: str) -> dict[str, Any] | None:
+        """Get an optimization run by ID (with user ownership check).
+
+        Iteration feedback is embedded as ``optimization_iterations``, ordered by iteration.
+        """
         try:
-            result = (
+            result = await (
                 self._client.table("optimization_runs")
-                .select("*")
+                .select("*, optimization_iterations(iteration, passed, results)")
                 .eq("id", run_id)
                 .eq("user_id", user_id)
-                .single()
+                .order("iteration", foreign_table="optimization_iterations")
+                .maybe_single()
                 .execute()
             )
-            return result.data
+            return result.data if result else None
         except Exception as e:
             logger.warning(f"Failed to get optimization run: {e}")
             return None
 
-    def list_optimization_runs(self, user_id: str) -> list[dict[str, Any]]:
-        """List all optimization runs for a user."""
+    async def get_optimization_run_result(self, run_id: str, user_id: str) -> dict[str, Any] | None:
+        """Get just the status and result PDF path of a run (with user ownership check)."""
         try:
-            result = (
+            result = await (
                 self._client.table("optimization_runs")
-                .select("id, status, job_parsed, created_at")
+                .select("status, result_pdf_path")
+                .eq("id", run_id)
                 .eq("user_id", user_id)
-                .order("created_at", desc=True)
+                .maybe_single()
                 .execute()
             )
-            return result.data
+            return result.data if result else None
         except Exception as e:
-            logger.error(f"Failed to list optimization runs: {e}")
-            raise SupabaseError(f"Failed to list optimization runs: {e}") from e
+            logger.warning(f"Failed to get optimization run: {e}")
+            return None
 
-    def update_optimization_run(self, run_id: str, data: dict[str, Any]) -> dict[str, Any] | None:
+    def iter_optimization_runs(
+        self, user_id: str, page_size: int = LIST_PAGE_SIZE
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """List a user's optimization runs newest first, shaped like OptimizationSummary, a page at a time."""
+        return self._paginate(
+            lambda: (
+                self._client.table("optimization_runs")
+                .select(
+                    "id, status, job_title:job_parsed->>title, "
+                    "job_company:job_parsed->>company, job_url, created_at"
+                )
+                .eq("user_id", user_id)
+                .order("created_at", desc=True)
+                .order("id")
+            ),
+            page_size,
+            "list optimization runs",
+        )
+
+    async def update_optimization_run(self, run_id: str, data: dict[str, Any]) -> dict[str, Any] | None:
         """Update an optimization run."""
         try:
-            result = (
+            result = await (
                 self._client.table("optimization_runs")
                 .update(data)
                 .eq("id", run_id)
@@ -277,11 +606,21 @@ class SupabaseService:
             logger.error(f"Failed to update optimization run: {e}")
             raise SupabaseError(f"Failed to update optimization run: {e}") from e
 
-    def upload_result_pdf(self, run_id: str, user_id: str, pdf_bytes: bytes) -> str:
+    async def add_optimization_iterations(self, run_id: str, iterations: list[dict[str, Any]]) -> None:
+        """Append iteration feedback rows for an optimization run."""
+        try:
+            await self._client.table("optimization_iterations").insert(
+                [{"run_id": run_id, **it} for it in iterations]
+            ).execute()
+        except Exception as e:
+            logger.error(f"Failed to add optimization iterations: {e}")
+            raise SupabaseError(f"Failed to add optimization iterations: {e}") from e
+
+    async def upload_result_pdf(self, run_id: str, user_id: str, pdf_bytes: bytes) -> str:
         """Upload result PDF to storage."""
         file_path = f"{user_id}/results/{run_id}.pdf"
         try:
-            self._client.storage.from_("results").upload(
+            await self._client.storage.from_("results").upload(
                 file_path,
                 pdf_bytes,
                 file_options={"content-type": "application/pdf"},
@@ -291,33 +630,97 @@ class SupabaseService:
             logger.error(f"Failed to upload result PDF: {e}")
             raise SupabaseError(f"Failed to upload result PDF: {e}") from e
 
-    def download_result_pdf(self, file_path: str) -> bytes:
+    async def download_result_pdf(self, file_path: str) -> bytes:
         """Download result PDF from storage."""
         try:
-            response = self._client.storage.from_("results").download(file_path)
+            response = await self._client.storage.from_("results").download(file_path)
             return response
         except Exception as e:
             logger.error(f"Failed to download result PDF: {e}")
             raise SupabaseError(f"Failed to download result PDF: {e}") from e
 
-    def delete_result_pdf(self, file_path: str) -> None:
+    async def create_result_pdf_url(
+        self, file_path: str, expires_in: int = 300, download: str | None = None
+    ) -> str:
+        """Create a short-lived signed URL for a result PDF.
+
+        If download is given, storage serves the file as an attachment with that name.
+        """
+        try:
+            options = {"download": download} if download else None
+            response = await self._client.storage.from_("results").create_signed_url(
+                file_path, expires_in, options
+            )
+            return response["signedURL"]
+        except Exception as e:
+            logger.error(f"Failed to create result PDF URL: {e}")
+            raise SupabaseError(f"Failed to create result PDF URL: {e}") from e
+
+    async def delete_result_pdf(self, file_path: str) -> None:
         """Delete result PDF from storage."""
         try:
-            self._client.storage.from_("results").remove([file_path])
+            await self._client.storage.from_("results").remove([file_path])
         except Exception as e:
             logger.error(f"Failed to delete result PDF: {e}")
             raise SupabaseError(f"Failed to delete result PDF: {e}") from e
 
-    def delete_optimization_run(self, run_id: str) -> None:
-        """Delete an optimization run."""
+    async def delete_optimization_run(self, run_id: str, user_id: str) -> bool:
+        """Delete an optimization run and its result PDF (with user ownership check)."""
         try:
-            self._client.table("optimization_runs").delete().eq("id", run_id).execute()
+            # Ownership check and delete in one call (delete_optimization_run function)
+            result = await self._client.rpc(
+                "delete_optimization_run",
+                {
+                    "p_run_id": run_id,
+                    "p_user_id": user_id,
+                }
+            ).execute()
         except Exception as e:
             logger.error(f"Failed to delete optimization run: {e}")
             raise SupabaseError(f"Failed to delete optimization run: {e}") from e
 
+        if not result.data:
+            return False
+
+        pdf_path = result.data[0]["result_pdf_path"]
+        if pdf_path:
+            self._remove_file_later("results", pdf_path)
+        return True
+
+    # Job cache operations
+    async def get_cached_job(
+        self, input_hash: str, max_age: timedelta | None = None
+    ) -> dict[str, Any] | None:
+        """Get a cached parsed job posting by input hash, optionally no older than max_age."""
+        try:
+            query = (
+                self._client.table("job_cache")
+                .select("job_text, job_parsed")
+                .eq("input_hash", input_hash)
+            )
+            if max_age is not None:
+                cutoff = datetime.now(timezone.utc) - max_age
+                query = query.gte("created_at", cutoff.isoformat())
+            result = await query.limit(1).execute()
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.warning(f"Failed to get cached job: {e}")
+            return None
+
+    async def cache_job(self, input_hash: str, job_text: str, job_parsed: dict[str, Any]) -> None:
+        """Store a parsed job posting, replacing any previous entry for the input."""
+        try:
+            await self._client.table("job_cache").upsert({
+                "input_hash": input_hash,
+                "job_text": job_text,
+                "job_parsed": job_parsed,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }).execute()
+        except Exception as e:
+            logger.warning(f"Failed to cache job: {e}")
+
     # Subscription operations
-    def consume_request_atomic(
+    async def consume_request_atomic(
         self,
         user_id: str,
         is_subscriber: bool,
@@ -337,7 +740,7 @@ class SupabaseService:
             True if request was consumed, False if no quota available
         """
         try:
-            result = self._client.rpc(
+            result = await self._client.rpc(
                 "consume_request",
                 {
                     "p_user_id": user_id,
@@ -345,13 +748,104 @@ class SupabaseService:
                     "p_subscription_limit": subscription_limit,
                 }
             ).execute()
+            self._profile_cache.invalidate(user_id)
 
             return result.data is True
         except Exception as e:
             logger.error(f"Failed to consume request: {e}")
             raise SupabaseError(f"Failed to consume request: {e}") from e
 
-    def add_addon_credits_atomic(self, user_id: str, credits_to_add: int) -> bool:
+    async def claim_stripe_session(self, session_id: str, user_id: str) -> bool:
+        """
+        Mark a checkout session as processed.
+
+        Returns:
+            True if this call claimed the session, False if it was already processed
+        """
+        try:
+            result = await (
+                self._client.table("processed_stripe_sessions")
+                .upsert(
+                    {"session_id": session_id, "user_id": user_id},
+                    on_conflict="session_id",
+                    ignore_duplicates=True,
+                )
+                .execute()
+            )
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Failed to claim Stripe session: {e}")
+            raise SupabaseError(f"Failed to claim Stripe session: {e}") from e
+
+    async def release_stripe_session(self, session_id: str) -> None:
+        """Undo a session claim after its update failed, so it can be retried."""
+        try:
+            await self._client.table("processed_stripe_sessions").delete().eq(
+                "session_id", session_id
+            ).execute()
+        except Exception as e:
+            logger.error(f"Failed to release Stripe session: {e}")
+
+    async def claim_stripe_event(self, event_id: str, event_type: str) -> bool:
+        """
+        Mark a Stripe webhook event as processed.
+
+        Returns:
+            True if this call claimed the event, False if it was already processed
+        """
+        try:
+            result = await (
+                self._client.table("processed_stripe_events")
+                .upsert(
+                    {"event_id": event_id, "event_type": event_type},
+                    on_conflict="event_id",
+                    ignore_duplicates=True,
+                )
+                .execute()
+            )
+            return bool(result.data)
+        except Exception as e:
+            logger.error(f"Failed to claim Stripe event: {e}")
+            raise SupabaseError(f"Failed to claim Stripe event: {e}") from e
+
+    async def record_failed_stripe_event(
+        self, event_id: str, event_type: str, payload: dict[str, Any], error: str
+    ) -> None:
+        """Store a claimed Stripe event whose processing failed, for replay."""
+        try:
+            await self._client.table("failed_stripe_events").upsert({
+                "event_id": event_id,
+                "event_type": event_type,
+                "payload": payload,
+                "error": error,
+            }).execute()
+        except Exception as e:
+            logger.error(f"Failed to record failed Stripe event {event_id}: {e}")
+
+    async def apply_stripe_event(self, event_type: str, user_id: str, payload: dict[str, Any]) -> bool:
+        """
+        Apply a Stripe webhook event to the user's profile (handle_stripe_event function).
+
+        Returns:
+            True if the profile was updated
+        """
+        try:
+            result = await self._client.rpc(
+                "handle_stripe_event",
+                {
+                    "p_event_type": event_type,
+                    "p_user_id": user_id,
+                    "p_payload": payload,
+                }
+            ).execute()
+            self._profile_cache.invalidate(user_id)
+
+            return result.data is True
+        except Exception as e:
+            logger.error(f"Failed to apply Stripe event: {e}")
+            raise SupabaseError(f"Failed to apply Stripe event: {e}") from e
+
+    async def add_addon_credits_atomic(self, user_id: str, credits_to_add: int) -> bool:
         """
         Atomically add addon credits to user's account.
 
@@ -363,13 +857,14 @@ class SupabaseService:
             True if credits were added successfully
         """
         try:
-            result = self._client.rpc(
+            result = await self._client.rpc(
                 "add_addon_credits",
                 {
                     "p_user_id": user_id,
                     "p_credits": credits_to_add,
                 }
             ).execute()
+            self._profile_cache.invalidate(user_id)
 
             return result.data is True
         except Exception as e:
@@ -378,12 +873,5 @@ class SupabaseService:
 
     @staticmethod
     def _get_content_type(ext: str) -> str:
-        """Get content type for file extension."""
-        content_types = {
-            "pdf": "application/pdf",
-            "txt": "text/plain",
-            "tex": "text/x-tex",
-            "md": "text/markdown",
-            "html": "text/html",
-        }
-        return content_types.get(ext.lower(), "application/octet-stream")
+        """Get content type for a lowercase file extension."""
+        return _CONTENT_TYPES.get(ext, "application/octet-stream")
@@ -0,0 +1,6 @@
+-- Add content hash to cvs so identical re-uploads reuse the existing row
+ALTER TABLE cvs ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_cvs_user_content_hash ON cvs(user_id, content_hash);
+
+COMMENT ON COLUMN cvs.content_hash IS 'SHA-256 hex digest of the uploaded file bytes';
@@ -0,0 +1,13 @@
+-- Cache of scraped and parsed job postings, shared across users
+-- Keyed by SHA-256 of the raw job input (URL or pasted text)
+CREATE TABLE IF NOT EXISTS job_cache (
+    input_hash TEXT PRIMARY KEY,
+    job_text TEXT NOT NULL,
+    job_parsed JSONB NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Only the backend (service key) reads and writes the cache
+ALTER TABLE job_cache ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE job_cache IS 'Parsed job postings keyed by SHA-256 hex digest of the job input';
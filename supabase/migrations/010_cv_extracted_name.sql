@@ -0,0 +1,4 @@
+-- Cache the LLM-extracted candidate name on each CV so optimizations reuse it
+-- NULL = not extracted yet, '' = extracted but not found in the CV
+ALTER TABLE cvs ADD COLUMN IF NOT EXISTS first_name TEXT;
+ALTER TABLE cvs ADD COLUMN IF NOT EXISTS last_name TEXT;
@@ -0,0 +1,5 @@
+-- Precompute job_url so listing runs doesn't classify job_input per row
+ALTER TABLE optimization_runs ADD COLUMN IF NOT EXISTS job_url TEXT
+    GENERATED ALWAYS AS (CASE WHEN job_input ~ '^https?://' THEN job_input END) STORED;
+
+COMMENT ON COLUMN optimization_runs.job_url IS 'job_input when it is an http(s) URL, otherwise NULL';
@@ -0,0 +1,26 @@
+-- Consume a request and create the optimization run in one round trip
+-- Both happen in the function's transaction, so a failed insert refunds the request
+
+CREATE OR REPLACE FUNCTION start_optimization(
+    p_run_id UUID,
+    p_user_id UUID,
+    p_cv_id UUID,
+    p_job_input TEXT,
+    p_consume BOOLEAN,
+    p_is_subscriber BOOLEAN,
+    p_subscription_limit INTEGER DEFAULT 50
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF p_consume AND NOT consume_request(p_user_id, p_is_subscriber, p_subscription_limit) THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO optimization_runs (id, user_id, cv_id, job_input, status, iterations)
+    VALUES (p_run_id, p_user_id, p_cv_id, p_job_input, 'pending', 0);
+
+    RETURN TRUE;
+END;
+$$;
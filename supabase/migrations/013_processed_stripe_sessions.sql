@@ -0,0 +1,10 @@
+-- Checkout sessions already applied by /subscription/verify-checkout
+-- The primary key makes concurrent verifications of one session collapse to a single update
+CREATE TABLE IF NOT EXISTS processed_stripe_sessions (
+    session_id TEXT PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    processed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Only the backend (service key) reads and writes this table
+ALTER TABLE processed_stripe_sessions ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,13 @@
+-- Per-iteration validation feedback, appended as the optimization loop runs
+-- Replaces rewriting the whole optimization_runs.feedback array on every iteration
+CREATE TABLE IF NOT EXISTS optimization_iterations (
+    run_id UUID NOT NULL REFERENCES optimization_runs(id) ON DELETE CASCADE,
+    iteration INTEGER NOT NULL,
+    passed BOOLEAN NOT NULL,
+    results JSONB NOT NULL DEFAULT '[]',
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (run_id, iteration)
+);
+
+-- Only the backend (service key) reads and writes this table
+ALTER TABLE optimization_iterations ENABLE ROW LEVEL SECURITY;
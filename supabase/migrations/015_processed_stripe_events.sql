@@ -0,0 +1,10 @@
+-- Stripe webhook events already handled by /webhooks/stripe
+-- Stripe retries deliveries, the primary key lets a redelivered event be skipped
+CREATE TABLE IF NOT EXISTS processed_stripe_events (
+    event_id TEXT PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    processed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Only the backend (service key) reads and writes this table
+ALTER TABLE processed_stripe_events ENABLE ROW LEVEL SECURITY;
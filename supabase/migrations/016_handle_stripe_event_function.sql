@@ -0,0 +1,59 @@
+-- Apply a Stripe webhook event to a user's profile in one call
+-- p_payload carries the values the webhook resolved from Stripe (period end, ids, credits)
+
+CREATE OR REPLACE FUNCTION handle_stripe_event(
+    p_event_type TEXT,
+    p_user_id UUID,
+    p_payload JSONB
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    rows_affected INTEGER;
+BEGIN
+    CASE p_event_type
+        WHEN 'checkout.session.completed' THEN
+            IF p_payload ? 'addon_credits' THEN
+                -- Add-on purchase
+                UPDATE profiles
+                SET addon_credits = addon_credits + (p_payload->>'addon_credits')::INTEGER
+                WHERE id = p_user_id;
+            ELSE
+                -- Subscription checkout
+                UPDATE profiles
+                SET subscription_status = 'active',
+                    subscription_id = p_payload->>'subscription_id',
+                    stripe_customer_id = p_payload->>'stripe_customer_id',
+                    current_period_end = (p_payload->>'current_period_end')::TIMESTAMPTZ,
+                    period_request_count = 0
+                WHERE id = p_user_id;
+            END IF;
+
+        WHEN 'invoice.paid' THEN
+            -- Subscription renewed, reset the period quota
+            UPDATE profiles
+            SET subscription_status = 'active',
+                current_period_end = (p_payload->>'current_period_end')::TIMESTAMPTZ,
+                period_request_count = 0
+            WHERE id = p_user_id;
+
+        WHEN 'customer.subscription.updated' THEN
+            UPDATE profiles
+            SET subscription_status = p_payload->>'subscription_status',
+                current_period_end = (p_payload->>'current_period_end')::TIMESTAMPTZ
+            WHERE id = p_user_id;
+
+        WHEN 'customer.subscription.deleted' THEN
+            UPDATE profiles
+            SET subscription_status = 'expired'
+            WHERE id = p_user_id;
+
+        ELSE
+            RETURN FALSE;
+    END CASE;
+
+    GET DIAGNOSTICS rows_affected = ROW_COUNT;
+    RETURN rows_affected > 0;
+END;
+$$;
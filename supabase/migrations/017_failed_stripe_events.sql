@@ -0,0 +1,12 @@
+-- Dead letters for Stripe webhook events that failed after being acknowledged
+-- Stripe won't redeliver these, so they are kept for inspection and replay
+CREATE TABLE IF NOT EXISTS failed_stripe_events (
+    event_id TEXT PRIMARY KEY,
+    event_type TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    error TEXT NOT NULL,
+    failed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Only the backend (service key) reads and writes this table
+ALTER TABLE failed_stripe_events ENABLE ROW LEVEL SECURITY;
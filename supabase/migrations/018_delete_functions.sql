@@ -0,0 +1,27 @@
+-- Delete a CV or optimization run in one round trip
+-- Ownership is enforced in the WHERE clause; the storage path is returned so the
+-- caller can remove the file (no row means not found or not owned)
+
+CREATE OR REPLACE FUNCTION delete_cv(
+    p_cv_id UUID,
+    p_user_id UUID
+)
+RETURNS TEXT
+LANGUAGE sql
+AS $$
+    DELETE FROM cvs
+    WHERE id = p_cv_id AND user_id = p_user_id
+    RETURNING file_path;
+$$;
+
+CREATE OR REPLACE FUNCTION delete_optimization_run(
+    p_run_id UUID,
+    p_user_id UUID
+)
+RETURNS TABLE (result_pdf_path TEXT)
+LANGUAGE sql
+AS $$
+    DELETE FROM optimization_runs
+    WHERE id = p_run_id AND user_id = p_user_id
+    RETURNING optimization_runs.result_pdf_path;
+$$;